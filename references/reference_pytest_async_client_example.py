@@ -0,0 +1,159 @@
+# Pytest Async HTTP Client Example (pooled keep-alive connections, concurrency limits, mock transport)
+# Source: pytest_best_practices.md (Fixture scopes), project_management_guide.md (section 2.2 モックとスタブの活用)
+# Filename in guide: tests/integration/conftest.py
+#
+# reference_pytest_fixture_example.py の ApiClient.get や reference_pytest_mocking_example.py の
+# requests.get は1リクエストずつ同期的に処理する。ここでは httpx.AsyncClient を1セッションで共有し、
+# keep-aliveの接続プールとセマフォで同時実行数を制限しながら、まとめてリクエストを発行する。
+#
+# Requires: httpx, pytest-asyncio (>= 0.24, for loop_scope)
+
+import asyncio
+import os
+
+import httpx
+import pytest
+import pytest_asyncio
+
+# Local stand-in service used by the integration tests
+API_BASE_URL = os.environ.get("API_BASE_URL", "http://127.0.0.1:8000")
+# Requests in flight at once; the pool keeps up to this many keep-alive connections open
+MAX_CONCURRENCY = int(os.environ.get("API_MAX_CONCURRENCY", "32"))
+
+class AsyncApiClient:
+    """Async counterpart of ApiClient: one pooled httpx.AsyncClient plus a concurrency limit.
+
+    Pass `transport` (e.g. httpx.MockTransport) to replace the network in tests.
+    """
+
+    def __init__(self, base_url: str = API_BASE_URL, max_concurrency: int = MAX_CONCURRENCY,
+                 timeout: float = 10.0, transport: httpx.AsyncBaseTransport = None):
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency,
+                                keepalive_expiry=30.0),
+            transport=transport,
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def get(self, endpoint: str, params: dict = None) -> httpx.Response:
+        async with self._semaphore:
+            return await self._client.get(endpoint, params=params)
+
+    async def request(self, method: str, endpoint: str, **kwargs) -> httpx.Response:
+        async with self._semaphore:
+            return await self._client.request(method, endpoint, **kwargs)
+
+    async def get_many(self, endpoints, params: dict = None, return_exceptions: bool = False) -> list:
+        """GETs all endpoints concurrently (bounded by the semaphore); results keep the input order."""
+        return await asyncio.gather(*(self.get(endpoint, params) for endpoint in endpoints),
+                                    return_exceptions=return_exceptions)
+
+    async def request_many(self, requests, return_exceptions: bool = False) -> list:
+        """Issues (method, endpoint, kwargs) tuples concurrently; results keep the input order."""
+        return await asyncio.gather(*(self.request(method, endpoint, **kwargs) for method, endpoint, kwargs in requests),
+                                    return_exceptions=return_exceptions)
+
+    async def aclose(self):
+        await self._client.aclose()
+
+class MockApi:
+    """httpx.MockTransport handler returning a fixed response and recording the requests it served.
+
+    `delay` simulates service latency so concurrent calls really overlap;
+    `peak_in_flight` shows how many requests were served at the same time.
+    """
+
+    def __init__(self, json_data: dict, status_code: int, delay: float = 0.0):
+        self.json_data = json_data
+        self.status_code = status_code
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            return httpx.Response(self.status_code, json=self.json_data)
+        finally:
+            self.in_flight -= 1
+
+# --- conftest.py content example --- #
+
+# One client (and connection pool) for the whole session; its event loop must live as long
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def async_api_client():
+    client = AsyncApiClient()
+    yield client
+    await client.aclose()
+
+# Async counterparts of mock_api_get_success / mock_api_get_failure: the client talks to a
+# MockTransport, so concurrent calls need no monkeypatching of a module-level function.
+@pytest.fixture
+def mock_api_success():
+    return MockApi({"key": "value", "source": "mock"}, 200, delay=0.01)
+
+@pytest.fixture
+def mock_api_failure():
+    return MockApi({"error": "not found"}, 404)
+
+@pytest_asyncio.fixture
+async def mock_async_api_get_success(mock_api_success):
+    client = AsyncApiClient(max_concurrency=8, transport=httpx.MockTransport(mock_api_success))
+    yield client
+    await client.aclose()
+
+@pytest_asyncio.fixture
+async def mock_async_api_get_failure(mock_api_failure):
+    client = AsyncApiClient(transport=httpx.MockTransport(mock_api_failure))
+    yield client
+    await client.aclose()
+
+# --- test_async_api.py content example --- #
+
+@pytest.mark.asyncio
+async def test_get_many_with_mocked_success(mock_async_api_get_success, mock_api_success):
+    endpoints = [f"/users/{i}" for i in range(100)]
+    responses = await mock_async_api_get_success.get_many(endpoints)
+    assert [r.status_code for r in responses] == [200] * 100
+    assert responses[0].json() == {"key": "value", "source": "mock"}
+    # Results keep the input order even though requests complete out of order
+    assert [r.request.url.path for r in responses] == endpoints
+    assert 1 < mock_api_success.peak_in_flight <= 8
+
+@pytest.mark.asyncio
+async def test_get_many_with_mocked_failure(mock_async_api_get_failure):
+    responses = await mock_async_api_get_failure.get_many(["/missing"] * 10)
+    for response in responses:
+        with pytest.raises(httpx.HTTPStatusError):
+            response.raise_for_status()
+
+@pytest.mark.asyncio
+async def test_request_many_collects_exceptions():
+    def handler(request):
+        if request.url.path == "/boom":
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={})
+
+    client = AsyncApiClient(transport=httpx.MockTransport(handler))
+    try:
+        results = await client.request_many([("GET", "/ok", {}), ("GET", "/boom", {}), ("POST", "/ok", {"json": {}})],
+                                            return_exceptions=True)
+    finally:
+        await client.aclose()
+    assert results[0].status_code == 200
+    assert isinstance(results[1], httpx.ConnectError)
+    assert results[2].status_code == 200
+
+@pytest.mark.integration
+@pytest.mark.asyncio(loop_scope="session")
+async def test_endpoints_against_local_service(async_api_client):
+    """Thousands of calls reuse the session's keep-alive connections instead of reconnecting."""
+    responses = await async_api_client.get_many(["/health"] * 1000)
+    assert all(response.status_code == 200 for response in responses)
@@ -0,0 +1,232 @@
+# Pytest Record/Replay Example: Memory-mapped Cassettes for External HTTP Responses
+# 外部APIのレスポンスを一度だけ記録し、以降はmmapしたカセットから再生するモック例
+# Source: project_management_guide.md (section 2.2 自動テスト戦略 - モックとスタブの活用)
+# Filename in guide: tests/conftest.py
+#
+# reference_pytest_mocking_example.py の MockResponse はテストごとにJSONボディを組み立てるため、
+# 数MBのJSONフィクスチャは毎回デコードされる。ここでは:
+#   1) pytest --cassette-mode=record   : ローカルのスタンドインサービスに実際にリクエストし、レスポンスを記録
+#   2) pytest                          : 記録済みカセットから再生（ネットワークなし）
+# カセットは2ファイル構成: <name>.bin（ボディを連結したデータ、同一ボディは1回だけ格納）と
+# <name>.json（キー -> ステータス・ヘッダー・オフセット・長さ のインデックス）。
+# 再生時はデータファイルをmmapし、ボディはコピーせずmemoryviewで返す。デコード済みJSONは
+# セッション内の全テストで共有する（共有オブジェクトなので変更する場合はcopy.deepcopyすること）。
+# 記録は xdist なし（-n なし）で実行する。
+
+import hashlib
+import json
+import mmap
+import os
+from pathlib import Path
+from urllib.parse import urlencode
+
+import pytest
+import requests
+
+CASSETTE_DIR = Path(__file__).parent / "cassettes"
+DEFAULT_CASSETTE = "http"
+# Response headers worth keeping; everything else (dates, server ids) only bloats the cassette
+RECORDED_HEADERS = ("content-type", "content-encoding", "etag", "location")
+
+def request_key(method: str, url: str, params: dict = None) -> str:
+    """Stable key for one request: method, URL and sorted query parameters."""
+    query = urlencode(sorted((params or {}).items()), doseq=True)
+    return f"{method.upper()} {url}" + (f"?{query}" if query else "")
+
+class CassetteWriter:
+    """Appends response bodies to `<name>.bin` and writes the `<name>.json` index on close."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._data = open(path.with_suffix(".bin.tmp"), "wb")
+        self._offset = 0
+        self._index = {}
+        self._by_digest = {}  # body digest -> (offset, length): identical bodies are stored once
+
+    def add(self, key: str, status_code: int, headers: dict, body: bytes):
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        location = self._by_digest.get(digest)
+        if location is None:
+            self._data.write(body)
+            location = self._by_digest[digest] = (self._offset, len(body))
+            self._offset += len(body)
+        self._index[key] = {
+            "status_code": status_code,
+            "headers": {name: value for name, value in headers.items() if name.lower() in RECORDED_HEADERS},
+            "offset": location[0],
+            "length": location[1],
+        }
+
+    def close(self):
+        self._data.close()
+        os.replace(self.path.with_suffix(".bin.tmp"), self.path.with_suffix(".bin"))
+        tmp_index = self.path.with_suffix(".json.tmp")
+        with open(tmp_index, "w") as f:
+            json.dump(self._index, f, indent=0, sort_keys=True)
+        os.replace(tmp_index, self.path.with_suffix(".json"))
+
+class Cassette:
+    """Read-only view of a recorded cassette.
+
+    Bodies are memoryview slices of the memory-mapped data file (no copy);
+    decoded JSON bodies are cached per (offset, length), so each distinct
+    body is parsed at most once per session.
+    """
+
+    def __init__(self, path: Path):
+        with open(path.with_suffix(".json"), "r") as f:
+            self.index = json.load(f)
+        self._file = open(path.with_suffix(".bin"), "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        # mmap cannot map an empty file
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self._view = memoryview(self._map) if self._map is not None else memoryview(b"")
+        self._decoded = {}
+        self.decode_count = 0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index
+
+    def body(self, key: str) -> memoryview:
+        entry = self.index[key]
+        return self._view[entry["offset"]:entry["offset"] + entry["length"]]
+
+    def json(self, key: str):
+        entry = self.index[key]
+        cache_key = (entry["offset"], entry["length"])
+        if cache_key not in self._decoded:
+            # str(view, "utf-8") decodes straight from the mapped pages without an intermediate bytes copy
+            self._decoded[cache_key] = json.loads(str(self.body(key), "utf-8"))
+            self.decode_count += 1
+        return self._decoded[cache_key]
+
+    def response(self, key: str) -> "ReplayResponse":
+        if key not in self.index:
+            raise LookupError(f"No recorded response for '{key}'; re-record with pytest --cassette-mode=record")
+        return ReplayResponse(self, key)
+
+    def close(self):
+        try:
+            self._view.release()
+            if self._map is not None:
+                self._map.close()
+        except BufferError:
+            pass  # A test still holds a body view; the mapping is released when it is garbage collected
+        self._file.close()
+
+class ReplayResponse:
+    """The subset of requests.Response used by the tests (compare MockResponse in the mocking example)."""
+
+    def __init__(self, cassette: Cassette, key: str):
+        entry = cassette.index[key]
+        self._cassette = cassette
+        self._key = key
+        self.status_code = entry["status_code"]
+        self.headers = entry["headers"]
+
+    @property
+    def raw_body(self) -> memoryview:
+        return self._cassette.body(self._key)
+
+    @property
+    def content(self) -> bytes:
+        return bytes(self.raw_body)  # Copies; prefer raw_body or json() for large bodies
+
+    @property
+    def text(self) -> str:
+        return str(self.raw_body, "utf-8")
+
+    def json(self):
+        """Shared, already decoded body: treat it as read-only."""
+        return self._cassette.json(self._key)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"Error: {self.status_code}")
+
+# --- conftest.py content example --- #
+
+def pytest_addoption(parser):
+    parser.addoption("--cassette-mode", choices=("replay", "record"), default="replay",
+                     help="record: call the real service and store responses; replay: serve them from cassettes")
+
+@pytest.fixture(scope="session")
+def cassette(request):
+    """Session-wide cassette: a CassetteWriter when recording, a memory-mapped Cassette when replaying.
+
+    Replay tests are skipped (not errored) while no cassette has been recorded yet.
+    """
+    path = CASSETTE_DIR / DEFAULT_CASSETTE
+    if request.config.getoption("cassette_mode") == "record":
+        writer = CassetteWriter(path)
+        yield writer
+        writer.close()
+    else:
+        missing = [f.name for f in (path.with_suffix(".json"), path.with_suffix(".bin")) if not f.exists()]
+        if missing:
+            pytest.skip(f"Cassette not recorded ({', '.join(missing)} missing); re-record with pytest --cassette-mode=record")
+        replay = Cassette(path)
+        yield replay
+        replay.close()
+
+@pytest.fixture
+def recorded_requests_get(cassette, monkeypatch):
+    """Patches requests.get to record (record mode) or replay (default) responses by request key."""
+    if isinstance(cassette, CassetteWriter):
+        real_get = requests.get
+
+        def get(url, params=None, **kwargs):
+            response = real_get(url, params=params, **kwargs)
+            cassette.add(request_key("GET", url, params), response.status_code, response.headers, response.content)
+            return response
+    else:
+        def get(url, params=None, **kwargs):
+            return cassette.response(request_key("GET", url, params))
+    monkeypatch.setattr(requests, "get", get)
+    return cassette
+
+# --- test_reports.py content example --- #
+
+API_BASE_URL = os.environ.get("API_BASE_URL", "http://127.0.0.1:8000")
+
+def test_large_report_is_replayed(recorded_requests_get):
+    response = requests.get(f"{API_BASE_URL}/reports/large")
+    response.raise_for_status()
+    assert response.json()["items"]
+
+def test_large_report_is_decoded_once(recorded_requests_get):
+    """Runs after the test above: when replaying, the multi-MB body comes from the shared decoded cache."""
+    first = requests.get(f"{API_BASE_URL}/reports/large").json()
+    second = requests.get(f"{API_BASE_URL}/reports/large").json()
+    if isinstance(recorded_requests_get, CassetteWriter):
+        # 記録モードでは実際のResponseが返り、.json()は毎回新しいオブジェクトを作る
+        assert first == second
+    else:
+        assert first is second
+
+def test_cassette_round_trip(tmp_path):
+    """Store-level check that needs no service: dedup, zero-copy bodies and the decode cache."""
+    large_body = json.dumps({"items": [{"id": i, "name": f"item {i}"} for i in range(100_000)]}).encode()
+    writer = CassetteWriter(tmp_path / "sample")
+    writer.add(request_key("GET", "/reports/large"), 200, {"Content-Type": "application/json", "Date": "x"}, large_body)
+    writer.add(request_key("GET", "/reports/large", {"page": 1}), 200, {}, large_body)
+    writer.add(request_key("GET", "/missing"), 404, {}, b'{"error": "not found"}')
+    writer.close()
+    assert (tmp_path / "sample.bin").stat().st_size == len(large_body) + len(b'{"error": "not found"}')
+
+    replay = Cassette(tmp_path / "sample")
+    try:
+        response = replay.response(request_key("GET", "/reports/large"))
+        assert isinstance(response.raw_body, memoryview)
+        assert response.headers == {"Content-Type": "application/json"}
+        assert len(response.json()["items"]) == 100_000
+        # Same body under another key: served from the decoded cache
+        assert replay.response(request_key("GET", "/reports/large", {"page": 1})).json() is response.json()
+        assert replay.decode_count == 1
+        with pytest.raises(requests.exceptions.HTTPError):
+            replay.response(request_key("GET", "/missing")).raise_for_status()
+        with pytest.raises(LookupError):
+            replay.response(request_key("GET", "/not-recorded"))
+    finally:
+        replay.close()
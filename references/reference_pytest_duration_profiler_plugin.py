@@ -0,0 +1,121 @@
+# Pytest Plugin Example: Test / Fixture / Marker Duration Profiler
+# テスト実行時間（プロセス品質指標）を収集し、品質ダッシュボードに渡すpytestプラグイン例
+# Source: quality_dashboard_guide.md (プロセス品質指標: テスト実行時間), pytest_best_practices.md (プラグイン)
+# Filename in guide: tests/plugins/duration_profiler.py
+#
+# 有効化: conftest.py に `pytest_plugins = ["tests.plugins.duration_profiler"]` を追加し、
+#   pytest --durations-jsonl=reports_input/test-durations.jsonl
+# 出力 (1行1レコードのJSONL):
+#   {"type": "test", "nodeid": ..., "setup": s, "call": s, "teardown": s, "outcome": ..., "markers": [...]}
+#   {"type": "fixture", "nodeid": ..., "fixture": ..., "scope": ..., "phase": "setup"|"teardown", "seconds": s}
+#   {"type": "session", "wall_seconds": s, "workers": n}
+
+import json
+import re
+import time
+from functools import partial
+
+import pytest
+
+# Markers registered in reference_pytest_ini_example.ini that are broken out in the dashboard
+TRACKED_MARKERS = ("slow", "integration", "security", "smoke", "regression")
+# --dist loadgroup appends "@<group>" to nodeids in reports; records are keyed without it
+_GROUP_SUFFIX_PATTERN = re.compile(r"@[^@\[\]:]*$")
+
+def pytest_addoption(parser):
+    group = parser.getgroup("duration-profiler")
+    group.addoption(
+        "--durations-jsonl",
+        metavar="PATH",
+        default=None,
+        help="write per-test, per-fixture and per-marker durations to PATH as JSON lines",
+    )
+
+def pytest_configure(config):
+    path = config.getoption("durations_jsonl")
+    if path:
+        config.pluginmanager.register(DurationProfiler(config, path), "duration-profiler")
+
+class DurationProfiler:
+    """Collects phase and fixture timings with perf_counter and buffered JSONL writes.
+
+    Under pytest-xdist, fixture timings are measured in the workers and
+    attached to their test reports; only the controller writes the file.
+    """
+
+    def __init__(self, config, path):
+        self._path = path
+        self._is_worker = hasattr(config, "workerinput")
+        self._workers = getattr(config.option, "numprocesses", None) or 1
+        self._pending = []  # fixture timings not yet attached to a report
+        self._teardown_started = {}
+        self._tests = {}
+        self._file = None
+        self._session_started = None
+
+    # --- measurement (runs wherever the tests run) --- #
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        started = time.perf_counter()
+        try:
+            return (yield)
+        finally:
+            self._pending.append([fixturedef.argname, fixturedef.scope, "setup", time.perf_counter() - started])
+            # Finalizers run LIFO: this one runs right before the fixture's own teardown code
+            fixturedef.addfinalizer(partial(self._mark_teardown_start, fixturedef))
+
+    def _mark_teardown_start(self, fixturedef):
+        self._teardown_started[id(fixturedef)] = time.perf_counter()
+
+    def pytest_fixture_post_finalizer(self, fixturedef, request):
+        started = self._teardown_started.pop(id(fixturedef), None)
+        if started is not None:
+            self._pending.append([fixturedef.argname, fixturedef.scope, "teardown", time.perf_counter() - started])
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        report = yield
+        # Custom report attributes survive xdist's report serialization
+        report.fixture_durations, self._pending = self._pending, []
+        report.profiled_markers = [name for name in TRACKED_MARKERS if item.get_closest_marker(name)]
+        return report
+
+    # --- recording (controller / single process only) --- #
+
+    def pytest_sessionstart(self, session):
+        self._session_started = time.perf_counter()
+        if not self._is_worker:
+            self._file = open(self._path, "w", buffering=1 << 16)
+
+    def _write(self, record: dict):
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def pytest_runtest_logreport(self, report):
+        if self._file is None:
+            return
+        nodeid = _GROUP_SUFFIX_PATTERN.sub("", report.nodeid)
+        record = self._tests.get(nodeid)
+        if record is None:
+            record = self._tests[nodeid] = {
+                "type": "test", "nodeid": nodeid, "setup": 0.0, "call": 0.0, "teardown": 0.0,
+                "outcome": "passed", "markers": getattr(report, "profiled_markers", []),
+            }
+        record[report.when] = round(report.duration, 6)
+        if report.outcome != "passed" and record["outcome"] == "passed":
+            record["outcome"] = report.outcome
+        for name, scope, phase, seconds in getattr(report, "fixture_durations", ()):
+            self._write({"type": "fixture", "nodeid": nodeid, "fixture": name, "scope": scope,
+                         "phase": phase, "seconds": round(seconds, 6)})
+        if report.when == "teardown":
+            self._write(self._tests.pop(nodeid))
+
+    def pytest_sessionfinish(self, session):
+        if self._file is None:
+            return
+        for record in self._tests.values():  # Interrupted runs: flush what was recorded
+            self._write(record)
+        self._write({"type": "session", "wall_seconds": round(time.perf_counter() - self._session_started, 6),
+                     "workers": self._workers})
+        self._file.close()
+        self._file = None
@@ -0,0 +1,167 @@
+# Pytest Plugin Example: Duration-aware pytest-xdist Scheduling
+# 過去の実行時間に基づき、xdistワーカー間でテストを均等に割り振るpytestプラグイン例
+# Source: pytest_best_practices.md (pytest-xdistによる並列実行, プラグイン)
+# Filename in guide: tests/plugins/duration_scheduler.py
+#
+# 使い方:
+#   conftest.py: pytest_plugins = ["tests.plugins.duration_scheduler"]
+#   pytest -n 8 --dist loadgroup --duration-schedule [--duration-history=test-durations.jsonl]
+#
+# 仕組み:
+#   - 実行時間の履歴は .pytest_cache (config.cache) に指数移動平均で保存し、毎回更新する
+#   - モジュール単位（module/sessionフィクスチャの局所性を保つ単位）で最長処理時間順に
+#     最も負荷の低いワーカーへ詰め込み (LPT)、各ビンを xdist_group マークでワーカーに固定する
+#   - 1モジュールだけで理想負荷（合計/ワーカー数）を超える場合のみ、クラス・テスト単位に分割する
+#   - 前回失敗したテスト（pytest標準の cache/lastfailed）を含むモジュールを各ワーカーで先に実行する
+
+import heapq
+import json
+import re
+import statistics
+
+import pytest
+
+DURATIONS_CACHE_KEY = "duration_scheduler/durations"
+EWMA_ALPHA = 0.5  # Weight of the newest observation
+DEFAULT_DURATION = 1.0  # Seconds assumed for tests with no history at all
+# --dist loadgroup appends "@<group>" to nodeids in reports; history is keyed without it
+_GROUP_SUFFIX_PATTERN = re.compile(r"@[^@\[\]:]*$")
+
+def base_nodeid(nodeid: str) -> str:
+    return _GROUP_SUFFIX_PATTERN.sub("", nodeid)
+
+def pytest_addoption(parser):
+    group = parser.getgroup("duration-scheduler")
+    group.addoption("--duration-schedule", action="store_true", default=False,
+                    help="bin-pack tests across xdist workers using historical durations (needs --dist loadgroup)")
+    group.addoption("--duration-history", metavar="PATH", default=None,
+                    help="JSONL written by the duration profiler plugin, used to seed missing history")
+
+def pytest_configure(config):
+    if config.getoption("duration_schedule"):
+        config.pluginmanager.register(DurationScheduler(config), "duration-scheduler")
+
+def load_profiler_durations(path) -> dict:
+    """Reads {nodeid: seconds} from the duration profiler's JSONL "test" records (group suffixes removed)."""
+    durations = {}
+    with open(path, "r") as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get("type") == "test":
+                durations[base_nodeid(record["nodeid"])] = record["setup"] + record["call"] + record["teardown"]
+    return durations
+
+def _unit_key(item) -> str:
+    """Scheduling unit: an explicit xdist_group, else the test module."""
+    marker = item.get_closest_marker("xdist_group")
+    if marker is not None:
+        return "group:" + str(marker.kwargs.get("name", marker.args[0] if marker.args else "default"))
+    return item.nodeid.split("::", 1)[0]
+
+def _split_unit(items):
+    """Splits an oversized module into classes (keeping class fixtures together) and lone tests."""
+    parts = {}
+    for item in items:
+        parts.setdefault("::".join(item.nodeid.split("::")[:2]) if item.cls else item.nodeid, []).append(item)
+    return list(parts.values())
+
+def pack_longest_first(units: list, workers: int) -> list:
+    """LPT bin packing: units is [(seconds, unit_items)], returns `workers` bins of (load, [unit_items, ...])."""
+    bins = [(0.0, index, []) for index in range(workers)]
+    heapq.heapify(bins)
+    # Ties broken by the first nodeid so every xdist worker computes the same plan
+    for seconds, unit in sorted(units, key=lambda u: (-u[0], u[1][0].nodeid)):
+        load, index, assigned = heapq.heappop(bins)
+        assigned.append(unit)
+        heapq.heappush(bins, (load + seconds, index, assigned))
+    return [(load, assigned) for load, _, assigned in sorted(bins, key=lambda b: b[1])]
+
+class DurationScheduler:
+    def __init__(self, config):
+        self._config = config
+        self._is_worker = hasattr(config, "workerinput")
+        self._observed = {}  # nodeid -> seconds in this run (controller only)
+        self._worker_load = {}  # xdist worker id -> busy seconds in this run (controller only)
+
+    def _history(self) -> dict:
+        durations = dict(self._config.cache.get(DURATIONS_CACHE_KEY, {}))
+        path = self._config.getoption("duration_history")
+        if path:
+            for nodeid, seconds in load_profiler_durations(path).items():
+                durations.setdefault(nodeid, seconds)
+        return durations
+
+    def _worker_count(self) -> int:
+        if self._is_worker:
+            return int(self._config.workerinput.get("workercount", 1))
+        return 1
+
+    def pytest_collection_modifyitems(self, session, config, items):
+        # This plugin is registered after xdist's worker plugin, so (hooks run LIFO) the
+        # xdist_group marks below are in place before xdist derives the group nodeids.
+        # xdistは全ワーカーの収集結果が一致することを要求するため、計画は決定的に作る
+        history = self._history()
+        fallback = statistics.median(history.values()) if history else DEFAULT_DURATION
+        last_failed = {base_nodeid(nodeid) for nodeid in config.cache.get("cache/lastfailed", {})}
+
+        units = {}
+        for item in items:
+            units.setdefault(_unit_key(item), []).append(item)
+
+        def unit_seconds(unit_items):
+            return sum(history.get(item.nodeid, fallback) for item in unit_items)
+
+        workers = self._worker_count()
+        timed_units = [(unit_seconds(unit_items), unit_items) for unit_items in units.values()]
+        ideal = sum(seconds for seconds, _ in timed_units) / workers
+        if workers > 1:
+            # Only modules that alone exceed one worker's fair share lose their locality
+            split = []
+            for seconds, unit_items in timed_units:
+                if seconds > ideal and not _unit_key(unit_items[0]).startswith("group:"):
+                    split.extend((unit_seconds(part), part) for part in _split_unit(unit_items))
+                else:
+                    split.append((seconds, unit_items))
+            timed_units = split
+
+        ordered = []
+        for index, (_, bin_units) in enumerate(pack_longest_first(timed_units, workers)):
+            # Units with a recent failure run first; within a unit the collection order is kept
+            bin_units.sort(key=lambda unit_items: not any(item.nodeid in last_failed for item in unit_items))
+            for unit_items in bin_units:
+                for item in unit_items:
+                    if workers > 1 and item.get_closest_marker("xdist_group") is None:
+                        item.add_marker(pytest.mark.xdist_group(name=f"duration_bin_{index}"))
+                    ordered.append(item)
+        items[:] = ordered
+
+    def pytest_runtest_logreport(self, report):
+        if self._is_worker:
+            return
+        nodeid = base_nodeid(report.nodeid)
+        self._observed[nodeid] = self._observed.get(nodeid, 0.0) + report.duration
+        node = getattr(report, "node", None)
+        if node is not None:
+            worker = node.gateway.id
+            self._worker_load[worker] = self._worker_load.get(worker, 0.0) + report.duration
+
+    def pytest_sessionfinish(self, session):
+        if self._is_worker or not self._observed:
+            return
+        durations = dict(self._config.cache.get(DURATIONS_CACHE_KEY, {}))
+        for nodeid, seconds in self._observed.items():
+            previous = durations.get(nodeid)
+            durations[nodeid] = seconds if previous is None else EWMA_ALPHA * seconds + (1 - EWMA_ALPHA) * previous
+        self._config.cache.set(DURATIONS_CACHE_KEY, durations)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self._worker_load:
+            return
+        loads = self._worker_load.values()
+        ideal = sum(loads) / len(self._worker_load)
+        busiest = max(loads)
+        terminalreporter.section("duration scheduler")
+        terminalreporter.write_line(
+            f"workers: {len(self._worker_load)}, busiest: {busiest:.1f}s, "
+            f"ideal (cpu time / workers): {ideal:.1f}s, balance: {ideal / busiest * 100 if busiest else 100:.0f}%"
+        )
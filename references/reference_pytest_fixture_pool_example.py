@@ -0,0 +1,253 @@
+# Pytest Fixture Pool Example (per-worker connection reuse with transactional leases)
+# Source: pytest_best_practices.md (Fixture scopes, pytest-xdist)
+#
+# reference_pytest_fixture_example.py の db_connection はモジュールごとにセットアップ/破棄されるため、
+# pytest-xdist (-n 32 など) では同じ接続処理が何十回も繰り返される。
+# ここでは各ワーカーが上限付きのプールを1つだけ持ち、テストにはロールバック付きの「リース」を貸し出す。
+
+import contextlib
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+import pytest
+
+# Upper bound of pooled resources per xdist worker (one test runs at a time per worker,
+# so a small pool is enough; extra slots cover fixtures that lease more than once)
+POOL_MAX_SIZE = int(os.environ.get("TEST_POOL_MAX_SIZE", "2"))
+
+def current_worker_id() -> str:
+    """xdist worker id ("gw0", "gw1", ...) or "master" when running without xdist."""
+    return os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+class FixtureTimings:
+    """Accumulates setup/teardown counts and durations per fixture name."""
+
+    def __init__(self):
+        self._stats = defaultdict(lambda: {"setup_count": 0, "setup_seconds": 0.0,
+                                           "teardown_count": 0, "teardown_seconds": 0.0})
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def measure(self, fixture_name: str, phase: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                stats = self._stats[fixture_name]
+                stats[f"{phase}_count"] += 1
+                stats[f"{phase}_seconds"] += elapsed
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def merge(self, other: dict):
+        """Adds stats collected by another process (e.g. an xdist worker)."""
+        with self._lock:
+            for name, stats in other.items():
+                for key, value in stats.items():
+                    self._stats[name][key] += value
+
+FIXTURE_TIMINGS = FixtureTimings()
+
+class ResourcePool:
+    """Bounded pool of reusable resources (DB connections, API clients) for one worker process.
+
+    - factory(): creates a resource (only when no idle one exists and the pool is not full)
+    - begin(resource): called when a lease starts, e.g. BEGIN a transaction
+    - reset(resource): called when a lease ends, e.g. ROLLBACK, so the next test sees clean state
+    - close(resource): called once per resource when the pool is closed
+    """
+
+    def __init__(self, name, factory, begin=None, reset=None, close=None,
+                 max_size: int = POOL_MAX_SIZE, timings: FixtureTimings = FIXTURE_TIMINGS):
+        self.name = name
+        self._factory = factory
+        self._begin = begin
+        self._reset = reset
+        self._close = close
+        self._max_size = max_size
+        self._timings = timings
+        self._idle = queue.LifoQueue()  # LIFO keeps the most recently used (warm) resource in play
+        self._all = []
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float = 30.0):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_create = len(self._all) < self._max_size
+            if can_create:
+                self._all.append(None)  # Reserve the slot before the (slow) factory call
+        if can_create:
+            try:
+                with self._timings.measure(f"{self.name}:create", "setup"):
+                    resource = self._factory()
+            except BaseException:
+                with self._lock:
+                    self._all.remove(None)
+                raise
+            with self._lock:
+                self._all[self._all.index(None)] = resource
+            return resource
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise RuntimeError(f"Pool '{self.name}' exhausted ({self._max_size} resources leased)") from None
+
+    def release(self, resource, discard: bool = False):
+        if discard:
+            with self._lock:
+                self._all.remove(resource)
+            if self._close:
+                self._close(resource)
+            return
+        self._idle.put(resource)
+
+    @contextlib.contextmanager
+    def lease(self, fixture_name: str = None):
+        """Lends one resource for the duration of the block and resets it afterwards.
+
+        A resource whose begin or reset fails is discarded instead of being
+        returned to the pool, so one broken test cannot leak state into the
+        next and failed setups cannot exhaust the pool.
+        """
+        fixture_name = fixture_name or f"{self.name}:lease"
+        with self._timings.measure(fixture_name, "setup"):
+            resource = self.acquire()
+            if self._begin:
+                try:
+                    self._begin(resource)
+                except BaseException:
+                    self.release(resource, discard=True)
+                    raise
+        try:
+            yield resource
+        finally:
+            with self._timings.measure(fixture_name, "teardown"):
+                try:
+                    if self._reset:
+                        self._reset(resource)
+                except Exception:
+                    self.release(resource, discard=True)
+                else:
+                    self.release(resource)
+
+    def close_all(self):
+        with self._timings.measure(f"{self.name}:create", "teardown"):
+            with self._lock:
+                resources, self._all = [r for r in self._all if r is not None], []
+            for resource in resources:
+                if self._close:
+                    self._close(resource)
+
+# --- conftest.py content example --- #
+
+@pytest.fixture(scope="session")
+def db_pool(tmp_path_factory):
+    """Session-scoped, per-worker pool of SQLite connections (stand-in for a real DB)."""
+    # xdistの各ワーカーは別プロセスなので、DBファイルもワーカーごとに分けて競合を避ける
+    db_file = tmp_path_factory.getbasetemp() / f"test_db_{current_worker_id()}.sqlite3"
+
+    def connect():
+        # isolation_level=None: transactions are controlled explicitly by begin/reset below
+        return sqlite3.connect(str(db_file), isolation_level=None, check_same_thread=False)
+
+    with FIXTURE_TIMINGS.measure("db_pool", "setup"):
+        with contextlib.closing(connect()) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, username TEXT NOT NULL)")
+        pool = ResourcePool(
+            "db_connection",
+            factory=connect,
+            begin=lambda conn: conn.execute("BEGIN"),
+            reset=lambda conn: conn.execute("ROLLBACK") if conn.in_transaction else None,
+            close=lambda conn: conn.close(),
+        )
+    yield pool
+    with FIXTURE_TIMINGS.measure("db_pool", "teardown"):
+        pool.close_all()
+
+@pytest.fixture
+def db_lease(db_pool):
+    """Function-scoped lease: a pooled connection inside a transaction that is rolled back after the test."""
+    with db_pool.lease("db_lease") as conn:
+        yield conn
+
+@pytest.fixture(scope="session")
+def api_client_pool():
+    """Per-worker pool of ApiClient instances (see reference_pytest_fixture_example.py)."""
+    from reference_pytest_fixture_example import ApiClient
+
+    pool = ResourcePool("api_client", factory=ApiClient, close=lambda client: client.close())
+    yield pool
+    pool.close_all()
+
+@pytest.fixture
+def api_client_lease(api_client_pool):
+    with api_client_pool.lease("api_client_lease") as client:
+        yield client
+
+# Report fixture timings: workers ship their stats to the controller via xdist's workeroutput
+
+def pytest_sessionfinish(session):
+    workeroutput = getattr(session.config, "workeroutput", None)
+    if workeroutput is not None:
+        workeroutput["fixture_timings"] = FIXTURE_TIMINGS.as_dict()
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    FIXTURE_TIMINGS.merge(getattr(node, "workeroutput", {}).get("fixture_timings", {}))
+
+def pytest_terminal_summary(terminalreporter):
+    stats = FIXTURE_TIMINGS.as_dict()
+    if not stats:
+        return
+    terminalreporter.section("fixture setup/teardown times")
+    terminalreporter.write_line(f"{'fixture':<28}{'setups':>8}{'setup s':>10}{'teardowns':>11}{'teardown s':>12}")
+    for name, s in sorted(stats.items(), key=lambda item: -(item[1]["setup_seconds"] + item[1]["teardown_seconds"])):
+        terminalreporter.write_line(
+            f"{name:<28}{s['setup_count']:>8}{s['setup_seconds']:>10.4f}"
+            f"{s['teardown_count']:>11}{s['teardown_seconds']:>12.4f}"
+        )
+
+# --- test_users.py content example --- #
+
+def test_insert_user_is_visible_inside_lease(db_lease):
+    db_lease.execute("INSERT INTO users (username) VALUES ('alice')")
+    assert db_lease.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 1
+
+def test_previous_insert_was_rolled_back(db_lease):
+    """Runs after the test above on the same pooled connection: the insert must be gone."""
+    assert db_lease.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0
+
+def test_api_request_with_pooled_client(api_client_lease):
+    response = api_client_lease.get("/endpoint")
+    assert response.status_code == 200
+
+def test_failed_begin_does_not_leak_pool_slots():
+    """Resources whose begin raised are discarded, so later leases do not wait for an exhausted pool."""
+    begins = []
+
+    def begin(resource):
+        begins.append(resource)
+        if len(begins) <= 2:
+            raise sqlite3.OperationalError("cannot start a transaction")
+
+    closed = []
+    pool = ResourcePool("flaky", factory=object, begin=begin, close=closed.append,
+                        max_size=2, timings=FixtureTimings())
+    for _ in range(2):
+        with pytest.raises(sqlite3.OperationalError):
+            with pool.lease():
+                pass
+    assert closed == begins
+    with pool.lease() as resource:
+        assert resource is begins[-1]
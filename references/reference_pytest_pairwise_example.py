@@ -0,0 +1,254 @@
+# Pytest Parameterized Case Generator: Pairwise / n-wise Covering Arrays
+# パラメータの全組み合わせ（直積）ではなく、t個のパラメータ値の組み合わせを全て網羅する最小限のケースを生成する例
+# Source: project_management_guide.md (section 2.2 自動テスト戦略 - パラメータ化テスト), pytest_best_practices.md
+# Filename in guide: tests/helpers/case_generator.py
+#
+# endpoints × methods × roles × ... の直積は数万ケースになりやすいが、多くの不具合は
+# 2〜3個のパラメータの組み合わせで発生する。pairwise (strength=2) なら全ての値のペアを
+# 少なくとも1回は実行しつつ、ケース数をパラメータ数に対してほぼ対数的に抑えられる。
+#
+# 使い方:
+#   @pytest.mark.parametrize(list(GRID), covering_params(GRID, strength=2, name="api_access"))
+#   python reference_pytest_pairwise_example.py --benchmark   # 直積との実行時間比較
+
+import itertools
+import math
+import time
+
+import pytest
+
+# name -> report, printed in the terminal summary (without xdist; each xdist worker collects on its own)
+PRUNING_REPORTS = {}
+
+def _value_key(value):
+    """Hashable identity of a parameter value (dict/list params are compared by repr)."""
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+def _reduce_domain(values, key=None) -> list:
+    """Drops duplicate values and, with `key`, values equivalent to an earlier one (the first is kept)."""
+    seen, reduced = set(), []
+    for value in values:
+        identity = _value_key(key(value) if key else value)
+        if identity not in seen:
+            seen.add(identity)
+            reduced.append(value)
+    return reduced
+
+def covering_array(domains: dict, strength: int = 2, constraint=None) -> list:
+    """Greedily builds cases (dicts) so that every combination of `strength` parameter values occurs at least once.
+
+    `constraint(partial_case)` receives dicts with only some parameters set and
+    must return False as soon as an assignment is invalid; combinations it
+    rejects are not required, and cases are only completed with valid values.
+    The result is deterministic for a given input, so xdist workers agree on it.
+    """
+    names = list(domains)
+    values = [list(domains[name]) for name in names]
+    if not names or any(not domain for domain in values):
+        return []
+    strength = max(1, min(strength, len(names)))
+    combos = list(itertools.combinations(range(len(names)), strength))
+    combos_by_param = [[ci for ci, combo in enumerate(combos) if p in combo] for p in range(len(names))]
+
+    def allowed(assignment: dict) -> bool:
+        return constraint is None or constraint({names[p]: values[p][v] for p, v in assignment.items()})
+
+    # Tuples still to cover: (combo index, value index per parameter in the combo)
+    uncovered = set()
+    for ci, combo in enumerate(combos):
+        for value_indices in itertools.product(*(range(len(values[p])) for p in combo)):
+            if allowed(dict(zip(combo, value_indices))):
+                uncovered.add((ci, value_indices))
+    seeds = sorted(uncovered)
+    # Larger domains first: they have the most tuples to cover
+    order = sorted(range(len(names)), key=lambda p: -len(values[p]))
+
+    cases = []
+    for seed in seeds:
+        if seed not in uncovered:
+            continue
+        ci, value_indices = seed
+        assignment = dict(zip(combos[ci], value_indices))  # parameter index -> value index
+        for p in order:
+            if p in assignment:
+                continue
+            best, best_gain = None, -1
+            for v in range(len(values[p])):
+                assignment[p] = v
+                if not allowed(assignment):
+                    continue
+                gain = sum(
+                    1 for cj in combos_by_param[p]
+                    if all(q in assignment for q in combos[cj])
+                    and (cj, tuple(assignment[q] for q in combos[cj])) in uncovered
+                )
+                if gain > best_gain:
+                    best, best_gain = v, gain
+            if best is None:
+                assignment.pop(p)  # 最後に試した(拒否された)値を残さない
+                break
+            assignment[p] = best
+        if len(assignment) < len(names):
+            # 制約によりこの組み合わせを含む完全なケースが作れない: 網羅対象から外す
+            uncovered.discard(seed)
+            continue
+        uncovered.difference_update(
+            (cj, tuple(assignment[q] for q in combo)) for cj, combo in enumerate(combos)
+        )
+        cases.append({names[p]: values[p][assignment[p]] for p in range(len(names))})
+    return cases
+
+def generate_cases(domains: dict, strength: int = 2, constraint=None, equivalent: dict = None) -> tuple:
+    """Dedupes each domain, then builds a covering array; returns (cases, pruning report).
+
+    `equivalent` maps a parameter name to a key function: values with the same
+    key (e.g. roles with identical permission sets) are tested once.
+    """
+    equivalent = equivalent or {}
+    reduced = {name: _reduce_domain(values, equivalent.get(name)) for name, values in domains.items()}
+    cases = covering_array(reduced, strength, constraint)
+    cartesian = math.prod(len(values) for values in domains.values())
+    report = {
+        "parameters": len(domains),
+        "strength": min(strength, len(domains)),
+        "cartesian": cartesian,
+        "after_dedup": math.prod(len(values) for values in reduced.values()),
+        "cases": len(cases),
+        "pruned": cartesian - len(cases),
+        "reduction_pct": round((1 - len(cases) / cartesian) * 100.0, 2) if cartesian else 0.0,
+    }
+    return cases, report
+
+def _param_id(value) -> str:
+    if isinstance(value, dict):
+        return "+".join(f"{k}={v}" for k, v in value.items()) or "none"
+    return str(value).strip("/").replace("/", "_") or "root"
+
+def covering_params(domains: dict, strength: int = 2, constraint=None, equivalent: dict = None, name: str = None) -> list:
+    """pytest.param list for `@pytest.mark.parametrize(list(domains), ...)`, with readable ids."""
+    cases, report = generate_cases(domains, strength, constraint, equivalent)
+    PRUNING_REPORTS[name or ",".join(domains)] = report
+    return [
+        pytest.param(*(case[argname] for argname in domains), id="-".join(_param_id(case[argname]) for argname in domains))
+        for case in cases
+    ]
+
+# --- conftest.py content example --- #
+
+def pytest_terminal_summary(terminalreporter):
+    if not PRUNING_REPORTS:
+        return
+    terminalreporter.section("parameter grid pruning")
+    for name, r in PRUNING_REPORTS.items():
+        terminalreporter.write_line(
+            f"{name}: {r['cases']} cases instead of {r['cartesian']} ({r['strength']}-wise, "
+            f"{r['pruned']} pruned, -{r['reduction_pct']}%; {r['after_dedup']} after dedup)"
+        )
+
+# --- test_api_access.py content example --- #
+
+# Simplified RBAC table (see test_security_role_based_access_control in reference_pytest_security_test_example.py)
+ROLE_PERMISSIONS = {
+    "admin": {"read", "write", "delete"},
+    "editor": {"read", "write"},
+    "author": {"read", "write"},  # 権限がeditorと同一 -> 同値なケースとして1回だけテスト
+    "user": {"read"},
+    "guest": set(),
+}
+METHOD_PERMISSION = {"GET": "read", "POST": "write", "PUT": "write", "DELETE": "delete"}
+
+API_GRID = {
+    "endpoint": ["/users", "/products", "/orders", "/articles", "/comments", "/reports"],
+    "method": ["GET", "POST", "PUT", "DELETE"],
+    "role": list(ROLE_PERMISSIONS),
+    "params": [{}, {"active": True}, {"page": 2}, {"sort": "-created"}],
+    "content_type": ["application/json", "application/x-www-form-urlencoded"],
+}
+
+def api_grid_constraint(case: dict) -> bool:
+    # GETにはリクエストボディがないため、フォーム形式の組み合わせは無効
+    return not (case.get("method") == "GET" and case.get("content_type") == "application/x-www-form-urlencoded")
+
+def check_access(role: str, method: str, endpoint: str) -> bool:
+    """Stand-in for the application's authorization check."""
+    return METHOD_PERMISSION[method] in ROLE_PERMISSIONS[role]
+
+@pytest.mark.security
+@pytest.mark.parametrize(list(API_GRID), covering_params(
+    API_GRID, strength=2, constraint=api_grid_constraint,
+    equivalent={"role": lambda role: frozenset(ROLE_PERMISSIONS[role])}, name="api_access",
+))
+def test_api_access_pairwise(endpoint, method, role, params, content_type):
+    """Every (endpoint, method), (method, role), (role, params), ... pair runs at least once."""
+    allowed = check_access(role, method, endpoint)
+    if role == "guest":
+        assert not allowed
+    if method == "GET" and role != "guest":
+        assert allowed
+
+def test_covering_array_never_emits_rejected_cases():
+    """When no value of the last-placed parameter is valid, the seed is dropped instead of emitted."""
+    domains = {"a": [0, 1, 2], "b": [0, 1, 2], "c": [0, 1]}
+
+    def constraint(case):
+        return not (case.get("a") == 0 and case.get("b") == 0 and "c" in case)
+
+    cases = covering_array(domains, strength=2, constraint=constraint)
+    assert cases
+    assert all(constraint(case) for case in cases)
+    assert not any(case["a"] == 0 and case["b"] == 0 for case in cases)
+
+# --- benchmark --- #
+
+def _simulated_test(case: dict, work: int = 2000) -> int:
+    """CPU-bound stand-in for one test's body (a real API test would take milliseconds)."""
+    acc = 0
+    for i in range(work):
+        acc = (acc * 31 + i + len(case)) % 1000003
+    return acc
+
+def benchmark(domains: dict = None, strength: int = 2, constraint=None, equivalent: dict = None) -> dict:
+    """Times the full cartesian product against the covering array (generation time included)."""
+    domains = domains or API_GRID
+    started = time.perf_counter()
+    full = 0
+    for combination in itertools.product(*domains.values()):
+        case = dict(zip(domains, combination))
+        if constraint is None or constraint(case):
+            _simulated_test(case)
+            full += 1
+    full_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    cases, report = generate_cases(domains, strength, constraint, equivalent)
+    generation_seconds = time.perf_counter() - started
+    for case in cases:
+        _simulated_test(case)
+    covering_seconds = time.perf_counter() - started
+    return dict(report, **{
+        "valid_cartesian": full,
+        "cartesian_seconds": round(full_seconds, 3),
+        "generation_seconds": round(generation_seconds, 3),
+        "covering_seconds": round(covering_seconds, 3),
+        "speedup": round(full_seconds / covering_seconds, 1) if covering_seconds else None,
+    })
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Compare covering arrays with the full cartesian product.")
+    parser.add_argument("--benchmark", action="store_true", help="time API_GRID at strengths 2 and 3")
+    parser.add_argument("--strength", type=int, nargs="*", default=[2, 3])
+    args = parser.parse_args()
+    if args.benchmark:
+        for strength in args.strength:
+            print(json.dumps(benchmark(API_GRID, strength, api_grid_constraint,
+                                       {"role": lambda role: frozenset(ROLE_PERMISSIONS[role])})))
+    else:
+        _, report = generate_cases(API_GRID, args.strength[0], api_grid_constraint)
+        print(json.dumps(report))
@@ -77,4 +77,6 @@ def test_api_endpoints(base_url, endpoint, params, expected_status):
 
 # Note: The actual functions being tested (convert_text, is_valid_email) 
 # would reside in your application's source code.
-# This file demonstrates how to set up parameterized tests for them. 
\ No newline at end of file
+# This file demonstrates how to set up parameterized tests for them. 
+# For grids that explode combinatorially (endpoints × params × roles ...), generate the cases
+# with covering_params() from reference_pytest_pairwise_example.py instead of listing them by hand.
@@ -0,0 +1,304 @@
+# Python Example: Batched Fuzz Harness for the Security Test Targets
+# XSS/SQLiのペイロードコーパスと変異（ミューテーション）をプロセスプールで大量に流し込むファズテスト例
+# Source: pytest_best_practices.md (Section 7.3 Specific Test Examples), security_tools_overview.md
+# Filename in guide: tests/security/fuzz_harness.py
+#
+# reference_pytest_security_test_example.py のパラメータ化テストは数個の固定ペイロードのみを確認する。
+# ここでは 1行1ペイロードのコーパス（SecLists等）を逐次読み込み、各ペイロードから変異を生成して
+# render_comment_unsafe / get_user_by_id_unsafe に流し、検出結果をシグネチャで重複除去する。
+#
+# 使い方:
+#   pytest -m security -k fuzz                                        # 小さな予算でのスモーク実行
+#   python tests/security/fuzz_harness.py --corpus xss.txt sqli.txt \
+#       --mutations 500 --processes 8 --report fuzz-findings.json    # 夜間ジョブ（数百万実行）
+
+import itertools
+import os
+import random
+import re
+import time
+import traceback
+from pathlib import Path
+from urllib.parse import quote
+
+import pytest
+
+import reference_pytest_security_test_example as security_example  # tests/security/test_security_*.py
+
+SEED_PAYLOADS = [
+    "<script>alert('XSS');</script>",
+    "<img src=x onerror=alert('XSS')>",
+    "<a href=\"javascript:alert(1)\">x</a>",
+    "<svg/onload=alert(1)>",
+    "<b>Safe comment</b>",
+    "1",
+    "42",
+    "1 OR 1=1",
+    "' OR '1'='1' --",
+    "1; DROP TABLE users; --",
+    "1 UNION SELECT username, password FROM users",
+]
+# Corpus payloads read per batch; a batch and its mutations are split into tasks of about
+# TASK_INPUTS inputs, so even a handful of seed payloads keeps every worker busy
+BATCH_SIZE = 64
+TASK_INPUTS = 4096
+# Tasks in flight per worker process: bounds memory while keeping every worker busy
+TASKS_PER_PROCESS = 2
+
+_EVENT_HANDLER_PATTERN = re.compile(r"<[^>]*\son\w+\s*=|<[^>]*/on\w+\s*=", re.IGNORECASE)
+_PLAIN_ID_PATTERN = re.compile(r"\d+")
+_UNICODE_DIGITS = {"1": "¹", "2": "²", "3": "٣", "4": "４"}
+_METACHARACTERS = ("'", '"', "<", ">", ";", "--", "/**/", "%00", "\\", "`")
+
+# --- mutations (each takes the payload, a random generator and the batch for splicing) --- #
+
+def _flip_case(payload, rng, batch):
+    return "".join(c.swapcase() if rng.random() < 0.3 else c for c in payload)
+
+def _url_encode(payload, rng, batch):
+    return quote(payload, safe="")
+
+def _entity_encode(payload, rng, batch):
+    if not payload:
+        return payload
+    i = rng.randrange(len(payload))
+    return payload[:i] + f"&#{ord(payload[i])};" + payload[i + 1:]
+
+def _insert_metacharacter(payload, rng, batch):
+    i = rng.randint(0, len(payload))
+    return payload[:i] + rng.choice(_METACHARACTERS) + payload[i:]
+
+def _replace_spaces(payload, rng, batch):
+    return payload.replace(" ", rng.choice(("/**/", "\t", "\n", "+", "  ")))
+
+def _unicode_digits(payload, rng, batch):
+    # str.isdigit() は "²" 等も数字とみなすが、int() は変換できない
+    return "".join(_UNICODE_DIGITS.get(c, c) if rng.random() < 0.5 else c for c in payload)
+
+def _splice(payload, rng, batch):
+    other = rng.choice(batch)
+    return payload[:rng.randint(0, len(payload))] + other[rng.randint(0, len(other)):]
+
+def _repeat(payload, rng, batch):
+    return payload * rng.randint(2, 4)
+
+MUTATORS = (_flip_case, _url_encode, _entity_encode, _insert_metacharacter, _replace_spaces,
+            _unicode_digits, _splice, _repeat)
+
+def mutate(payload: str, rng: random.Random, batch: list) -> str:
+    """Applies 1-3 random mutators in sequence."""
+    for mutator in rng.sample(MUTATORS, rng.randint(1, 3)):
+        payload = mutator(payload, rng, batch)
+    return payload
+
+# --- targets: return a finding kind (str) or None; exceptions are recorded as crashes --- #
+
+# The example targets print every query; inside the harness their module-level `print`
+# is replaced by this sink, which silences them and keeps the last line for the oracles.
+_last_output = [""]
+
+def _capture_print(*args, **kwargs):
+    _last_output[0] = " ".join(str(arg) for arg in args)
+
+def fuzz_render_comment(payload: str):
+    output = security_example.render_comment_unsafe(payload).lower()
+    if "<script" in output:
+        return "xss:script-tag"
+    if _EVENT_HANDLER_PATTERN.search(output):
+        return "xss:event-handler"
+    if "javascript:" in output:
+        return "xss:javascript-url"
+    return None
+
+def fuzz_user_lookup(payload: str):
+    record = security_example.get_user_by_id_unsafe(None, payload)
+    if record and record.get("is_admin"):
+        return "sqli:admin-record-returned"
+    # Anything but a plain integer that reaches the SQL text is an injection vector
+    query = _last_output[0]
+    if query.startswith("Executing SQL:") and not _PLAIN_ID_PATTERN.fullmatch(query.rsplit("id = ", 1)[-1]):
+        return "sqli:unparameterized-query"
+    return None
+
+FUZZ_TARGETS = {
+    "render_comment_unsafe": fuzz_render_comment,
+    "get_user_by_id_unsafe": fuzz_user_lookup,
+}
+
+# --- execution --- #
+
+def iter_corpus(paths):
+    """Streams payloads (one per line, `#` comments and blank lines skipped) from corpus files."""
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="surrogateescape") as f:
+            for line in f:
+                payload = line.rstrip("\r\n")
+                if payload and not payload.startswith("#"):
+                    yield payload
+
+def _crash_location(error: BaseException) -> str:
+    frame = traceback.extract_tb(error.__traceback__)[-1]
+    return f"{Path(frame.filename).name}:{frame.lineno}"
+
+def _init_worker():
+    security_example.print = _capture_print
+
+def run_batch(task: tuple) -> tuple:
+    """Runs one batch in the current process; returns (executions, {signature: [count, shortest input]})."""
+    task_seed, payloads, include_originals, mutations, target_names = task
+    rng = random.Random(task_seed)
+    findings = {}
+    executions = 0
+    targets = [(name, FUZZ_TARGETS[name]) for name in target_names]
+    for payload in payloads:
+        originals = (payload,) if include_originals else ()
+        for candidate in itertools.chain(originals, (mutate(payload, rng, payloads) for _ in range(mutations))):
+            for name, target in targets:
+                executions += 1
+                try:
+                    kind = target(candidate)
+                    location = ""
+                except Exception as e:
+                    kind, location = f"crash:{type(e).__name__}", _crash_location(e)
+                if kind is None:
+                    continue
+                signature = (name, kind, location)
+                entry = findings.get(signature)
+                if entry is None:
+                    findings[signature] = [1, candidate]
+                else:
+                    entry[0] += 1
+                    if len(candidate) < len(entry[1]):
+                        entry[1] = candidate  # Keep the shortest reproducer
+    return executions, findings
+
+def _tasks(payloads, mutations: int, target_names: tuple, seed: int):
+    """Yields (task seed, payloads, include originals, mutations per payload, targets) tuples."""
+    iterator = iter(payloads)
+    task_seeds = itertools.count(seed * 1_000_003)
+    while True:
+        batch = list(itertools.islice(iterator, BATCH_SIZE))
+        if not batch:
+            return
+        # The originals run in the first task of each batch, the mutation rounds are spread over all of them
+        per_task = max(1, TASK_INPUTS // len(batch))
+        remaining = mutations
+        include_originals = True
+        while include_originals or remaining > 0:
+            count = min(per_task, remaining)
+            yield next(task_seeds), batch, include_originals, count, target_names
+            remaining -= count
+            include_originals = False
+
+def run_fuzz(payloads, targets=tuple(FUZZ_TARGETS), mutations: int = 100, processes: int = None,
+             seed: int = 0, max_seconds: float = None) -> dict:
+    """Streams `payloads` and their mutations through `targets`, optionally across a process pool.
+
+    Batches are submitted with a bounded number in flight, so the corpus is
+    never held in memory. Findings are deduplicated by (target, kind, crash
+    location); each keeps its hit count and the shortest input that triggered it.
+    """
+    processes = processes or os.cpu_count() or 1
+    findings = {}
+    executions = 0
+    started = time.perf_counter()
+
+    def merge(result):
+        nonlocal executions
+        batch_executions, batch_findings = result
+        executions += batch_executions
+        for signature, (count, example) in batch_findings.items():
+            entry = findings.setdefault(signature, [0, example])
+            entry[0] += count
+            if len(example) < len(entry[1]):
+                entry[1] = example
+
+    def out_of_time():
+        return max_seconds is not None and time.perf_counter() - started > max_seconds
+
+    tasks = _tasks(payloads, mutations, tuple(targets), seed)
+    if processes <= 1:
+        _init_worker()
+        try:
+            for task in tasks:
+                merge(run_batch(task))
+                if out_of_time():
+                    break
+        finally:
+            del security_example.print
+    else:
+        import collections
+        import multiprocessing
+
+        with multiprocessing.Pool(processes, initializer=_init_worker) as pool:
+            in_flight = collections.deque()
+            for task in tasks:
+                in_flight.append(pool.apply_async(run_batch, (task,)))
+                if len(in_flight) >= processes * TASKS_PER_PROCESS:
+                    merge(in_flight.popleft().get())
+                if out_of_time():
+                    break
+            while in_flight:
+                merge(in_flight.popleft().get())
+
+    seconds = time.perf_counter() - started
+    return {
+        "executions": executions,
+        "seconds": round(seconds, 3),
+        "execs_per_sec": round(executions / seconds) if seconds else None,
+        "processes": processes,
+        "unique_findings": len(findings),
+        "findings": [
+            {"target": target, "kind": kind, "location": location, "count": count, "example": example}
+            for (target, kind, location), (count, example) in sorted(findings.items(), key=lambda item: -item[1][0])
+        ],
+    }
+
+# --- test_security_fuzz.py content example --- #
+
+# Mutations per seed payload in the pytest run; raise it (or use the CLI) for nightly jobs
+FUZZ_MUTATIONS = int(os.environ.get("FUZZ_MUTATIONS", "200"))
+
+@pytest.mark.security
+@pytest.mark.slow
+def test_security_fuzz_comment_rendering_and_user_lookup():
+    """The example targets are deliberately unsafe: the fuzzer must rediscover each class of flaw."""
+    result = run_fuzz(SEED_PAYLOADS, mutations=FUZZ_MUTATIONS, processes=1)
+    kinds = {(finding["target"], finding["kind"]) for finding in result["findings"]}
+    print(f"Fuzzing: {result['executions']} executions, {result['execs_per_sec']}/s, "
+          f"{result['unique_findings']} unique findings")
+    assert ("render_comment_unsafe", "xss:script-tag") in kinds
+    assert ("render_comment_unsafe", "xss:event-handler") in kinds
+    assert ("get_user_by_id_unsafe", "sqli:admin-record-returned") in kinds
+    assert ("get_user_by_id_unsafe", "sqli:unparameterized-query") in kinds
+    # Duplicates collapse into one entry per signature
+    assert result["unique_findings"] < result["executions"]
+
+def main(argv=None):
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Fuzz the security example targets with payload corpora.")
+    parser.add_argument("--corpus", nargs="*", type=Path, default=[],
+                        help="payload files, one per line (default: built-in seeds)")
+    parser.add_argument("--targets", nargs="*", choices=list(FUZZ_TARGETS), default=list(FUZZ_TARGETS))
+    parser.add_argument("--mutations", type=int, default=100, help="mutated inputs generated per payload")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-seconds", type=float, default=None, help="stop submitting batches after this time")
+    parser.add_argument("--report", type=Path, help="write the full result as JSON")
+    args = parser.parse_args(argv)
+
+    payloads = iter_corpus(args.corpus) if args.corpus else SEED_PAYLOADS
+    result = run_fuzz(payloads, args.targets, args.mutations, args.processes, args.seed, args.max_seconds)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(result, f, indent=2)
+    print(f"{result['executions']} executions in {result['seconds']}s ({result['execs_per_sec']}/s, "
+          f"{result['processes']} processes), {result['unique_findings']} unique findings")
+    for finding in result["findings"]:
+        print(f"  {finding['count']:>10}  {finding['target']}  {finding['kind']}  {finding['location']}  "
+              f"example={finding['example']!r}")
+
+if __name__ == "__main__":
+    main()
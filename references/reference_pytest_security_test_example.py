@@ -23,6 +23,72 @@ class User:
             return True
         return False
 
+# Role definitions equivalent to User.has_permission ("*" grants every permission, even unknown ones)
+ROLE_DEFINITIONS = {
+    "admin": {"*"},
+    "editor": {"edit_article", "view_article"},
+    "user": {"view_article"},
+    "guest": set(),
+}
+
+class PermissionTable:
+    """RBAC rules compiled once into one integer bitmask per role.
+
+    Each known permission gets a bit; a check is a dict lookup plus a bitwise
+    AND instead of a chain of comparisons, cheap enough to need no cache. What
+    is cached is the row of booleans for a (role, permission list) pair, which
+    check_many shares between every user with that role, across calls.
+    """
+
+    def __init__(self, role_definitions: dict, cache_size: int = 4096):
+        permissions = sorted({p for granted in role_definitions.values() for p in granted if p != "*"})
+        self.permission_bits = {name: 1 << i for i, name in enumerate(permissions)}
+        all_bits = (1 << len(permissions)) - 1
+        self.role_masks = {}
+        self.wildcard_roles = set()
+        for role, granted in role_definitions.items():
+            if "*" in granted:
+                self.wildcard_roles.add(role)
+                self.role_masks[role] = all_bits
+            else:
+                self.role_masks[role] = sum(self.permission_bits[p] for p in granted)
+        self._rows = {}  # (role, permissions) -> row
+        self._cache_size = cache_size
+
+    def check(self, role: str, permission_name: str) -> bool:
+        if role in self.wildcard_roles:
+            return True
+        return bool(self.role_masks.get(role, 0) & self.permission_bits.get(permission_name, 0))
+
+    def row(self, role: str, permissions: tuple) -> tuple:
+        """Booleans for `permissions` (in order) for one role, computed once per (role, permissions)."""
+        key = (role, permissions)
+        row = self._rows.get(key)
+        if row is None:
+            if role in self.wildcard_roles:
+                row = (True,) * len(permissions)
+            else:
+                mask = self.role_masks.get(role, 0)
+                row = tuple(bool(mask & self.permission_bits.get(p, 0)) for p in permissions)
+            if len(self._rows) >= self._cache_size:
+                self._rows.clear()
+            self._rows[key] = row
+        return row
+
+    def check_many(self, users, permissions) -> list:
+        """Returns one tuple of booleans (in `permissions` order) per user."""
+        permissions = tuple(permissions)
+        rows = {}  # Per-call shortcut: skips building the cache key for every user
+        result = []
+        for user in users:
+            row = rows.get(user.role)
+            if row is None:
+                row = rows[user.role] = self.row(user.role, permissions)
+            result.append(row)
+        return result
+
+PERMISSION_TABLE = PermissionTable(ROLE_DEFINITIONS)
+
 def render_comment_unsafe(comment_text):
     """Simulates rendering a comment without proper XSS sanitization."""
     return f"<div>{comment_text}</div>"
@@ -125,6 +191,17 @@ def test_security_role_based_access_control(user_role, permission_to_check, expe
     # ASSERT
     assert has_access == expected_result, description
 
+@pytest.mark.security
+def test_security_permission_table_matches_has_permission():
+    """The compiled table must agree with User.has_permission for every role and permission."""
+    permissions = ["edit_article", "view_article", "delete_user", "unknown_permission"]
+    users = [User(f"user_{role}", role=role) for role in list(ROLE_DEFINITIONS) + ["unknown_role"]]
+    rows = PERMISSION_TABLE.check_many(users, permissions)
+    for user, row in zip(users, rows):
+        for permission, allowed in zip(permissions, row):
+            assert allowed == user.has_permission(permission), (user.role, permission)
+            assert PERMISSION_TABLE.check(user.role, permission) == allowed, (user.role, permission)
+
 # Located in e.g. tests/security/test_security_configuration.py
 @pytest.mark.security
 @patch('__main__.AppConfig.DEBUG_MODE', False) # Ensure default is False for most tests
@@ -145,8 +222,33 @@ def test_security_debug_mode_can_be_enabled_for_testing_explicitly():
     # ASSERT
     assert config.DEBUG_MODE is True, "DEBUG_MODE should be True when explicitly overridden for testing"
 
+def benchmark_permission_checks(num_users: int = 10_000) -> dict:
+    """Times per-call User.has_permission against PermissionTable.check, cached rows and check_many on the same matrix."""
+    import time
+
+    roles = list(ROLE_DEFINITIONS)
+    permissions = ["edit_article", "view_article", "delete_user", "publish_article", "view_reports"]
+    users = [User(f"user{i}", role=roles[i % len(roles)]) for i in range(num_users)]
+    permission_tuple = tuple(permissions)
+    results = {"checks": num_users * len(permissions)}
+    table = PermissionTable(ROLE_DEFINITIONS)
+    for label, run in (
+        ("has_permission", lambda: [[u.has_permission(p) for p in permissions] for u in users]),
+        ("check", lambda: [[table.check(u.role, p) for p in permissions] for u in users]),
+        ("cached_row", lambda: [table.row(u.role, permission_tuple) for u in users]),
+        ("check_many", lambda: table.check_many(users, permissions)),
+    ):
+        started = time.perf_counter()
+        run()
+        results[f"{label}_seconds"] = round(time.perf_counter() - started, 4)
+    return results
+
 # Note: To run these tests, you would save this content into the respective
 # files within your `tests/security/` directory, and ensure the application code
 # (User, render_comment_unsafe, get_user_by_id_unsafe, AppConfig) is importable.
 # These examples are simplified; real-world tests would often involve more complex setup,
-# fixtures (e.g., for a test client or database session), and more sophisticated mocking. 
\ No newline at end of file
+# fixtures (e.g., for a test client or database session), and more sophisticated mocking. 
+
+if __name__ == "__main__":
+    # python reference_pytest_security_test_example.py  -> RBAC permission check benchmark
+    print(benchmark_permission_checks(200_000))
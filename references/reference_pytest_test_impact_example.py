@@ -0,0 +1,279 @@
+# Python Example: Test Impact Analysis with a Coverage-Context Reverse Index
+# 変更行に触れるテストだけを選択して実行するための逆引きインデックス例
+# Source: pytest_best_practices.md (pytest-cov), quality_dashboard_guide.md (CI/CD高速化)
+# Filename in guide: scripts/test_impact.py
+#
+# 1) インデックス更新（mainでの通常実行後。テストごとのカバレッジコンテキストが必要）:
+#      pytest --cov=src/ --cov-context=test
+#      python scripts/test_impact.py update --coverage-file .coverage --prune
+#    --prune は全テスト実行の結果でのみ使う（今回現れなかった削除・改名済みのテストを索引から外す）。
+#    選択実行の結果で更新する場合は付けない（実行したテストだけが更新される）。
+# 2) PRでの選択（事前ステップ）:
+#      python scripts/test_impact.py select --output selected_tests.txt
+#      if [ -s selected_tests.txt ]; then pytest @selected_tests.txt; fi   # pytest 8.2+ の引数ファイル
+#    インデックスが古い・設定ファイルが変わった等の場合は、全テストを指す引数（既定: tests）を出力する。
+#    影響を受けるテストがなければ空ファイルになる（空の引数ファイルでpytestを呼ぶと全テストが走るため注意）。
+#
+# Requires: coverage (pytest-cov) for `update` only; `select` uses just sqlite3 and git.
+
+import argparse
+import re
+import subprocess
+import sqlite3
+import sys
+from pathlib import Path
+
+INDEX_DB_FILE = Path("./.test_impact.sqlite")
+
+# Changes to these files can affect any test, so they always trigger a full run
+FULL_RUN_PATTERNS = (
+    re.compile(r"(^|/)conftest\.py$"),
+    re.compile(r"(^|/)(pytest\.ini|tox\.ini|setup\.cfg|setup\.py|pyproject\.toml)$"),
+    re.compile(r"(^|/)requirements[^/]*\.txt$"),
+)
+TEST_FILE_PATTERN = re.compile(r"(^|/)(test_[^/]*|[^/]*_test)\.py$")
+# Beyond this many commits between the indexed commit and HEAD, line numbers drift too far
+MAX_INDEX_AGE_COMMITS = 200
+# SQLite's default limit on bound parameters is 999
+_QUERY_CHUNK = 900
+
+# Bump when SCHEMA changes; an index with another version is rebuilt from scratch
+SCHEMA_VERSION = 2
+# Line numbers are only valid for the commit they were recorded at, so every test (and
+# every file's import-time lines) remembers its own commit and is diffed against it
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tests (
+    test_id INTEGER PRIMARY KEY,
+    nodeid TEXT NOT NULL UNIQUE,
+    commit_sha TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    file_id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    module_commit_sha TEXT
+);
+CREATE TABLE IF NOT EXISTS hits (
+    file_id INTEGER NOT NULL,
+    lineno INTEGER NOT NULL,
+    test_id INTEGER NOT NULL,
+    PRIMARY KEY (file_id, lineno, test_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS hits_by_test ON hits(test_id);
+-- Lines run with the empty context (module import: def/class headers, decorators, constants, imports)
+CREATE TABLE IF NOT EXISTS module_lines (
+    file_id INTEGER NOT NULL,
+    lineno INTEGER NOT NULL,
+    PRIMARY KEY (file_id, lineno)
+) WITHOUT ROWID;
+"""
+
+def _git(*args: str) -> str:
+    return subprocess.run(["git", *args], check=True, capture_output=True, text=True).stdout
+
+def open_index(db_file: Path = INDEX_DB_FILE) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(db_file))
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        tables = [name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        for table in tables:
+            conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.executescript(SCHEMA)
+    return conn
+
+def _get_id(conn, table: str, id_column: str, column: str, value: str) -> int:
+    row = conn.execute(f"SELECT {id_column} FROM {table} WHERE {column} = ?", (value,)).fetchone()
+    if row is not None:
+        return row[0]
+    return conn.execute(f"INSERT INTO {table} ({column}) VALUES (?)", (value,)).lastrowid
+
+def update_index(conn: sqlite3.Connection, coverage_file: Path, repo_root: Path = Path("."), prune: bool = False) -> int:
+    """Replaces the rows of every test found in `coverage_file`; other tests keep their rows.
+
+    This makes the update incremental: a run of only the selected tests
+    refreshes exactly those tests, which are stamped with the current commit
+    while the others keep the commit they were recorded at. With `prune`
+    (full runs only), tests absent
+    from `coverage_file` are deleted or renamed and are dropped from the index.
+    Lines run outside any test (import time) are kept per file in `module_lines`.
+    Returns the number of tests updated.
+    """
+    import coverage  # Only needed here; selection must stay import-light
+
+    data = coverage.CoverageData(basename=str(coverage_file))
+    data.read()
+    repo_root = repo_root.resolve()
+
+    # {nodeid: {relative path: set(lines)}}, pytest-cov contexts look like "tests/test_x.py::test_a|run"
+    per_test = {}
+    module_lines = {}  # {relative path: set(lines)} run with the empty context
+    for measured in data.measured_files():
+        try:
+            path = Path(measured).resolve().relative_to(repo_root).as_posix()
+        except ValueError:
+            continue  # Outside the repository (site-packages etc.)
+        for lineno, contexts in data.contexts_by_lineno(measured).items():
+            for context in contexts:
+                nodeid = context.split("|", 1)[0]
+                if nodeid:
+                    per_test.setdefault(nodeid, {}).setdefault(path, set()).add(lineno)
+                else:
+                    module_lines.setdefault(path, set()).add(lineno)
+
+    head = _git("rev-parse", "HEAD").strip()
+    with conn:
+        for nodeid, files in per_test.items():
+            test_id = _get_id(conn, "tests", "test_id", "nodeid", nodeid)
+            conn.execute("UPDATE tests SET commit_sha = ? WHERE test_id = ?", (head, test_id))
+            conn.execute("DELETE FROM hits WHERE test_id = ?", (test_id,))
+            for path, lines in files.items():
+                file_id = _get_id(conn, "files", "file_id", "path", path)
+                conn.executemany("INSERT OR IGNORE INTO hits (file_id, lineno, test_id) VALUES (?, ?, ?)",
+                                 ((file_id, lineno, test_id) for lineno in lines))
+        for path, lines in module_lines.items():
+            file_id = _get_id(conn, "files", "file_id", "path", path)
+            conn.execute("UPDATE files SET module_commit_sha = ? WHERE file_id = ?", (head, file_id))
+            conn.execute("DELETE FROM module_lines WHERE file_id = ?", (file_id,))
+            conn.executemany("INSERT INTO module_lines (file_id, lineno) VALUES (?, ?)",
+                             ((file_id, lineno) for lineno in lines))
+        if prune:
+            stale = [test_id for test_id, nodeid in conn.execute("SELECT test_id, nodeid FROM tests")
+                     if nodeid not in per_test]
+            for i in range(0, len(stale), _QUERY_CHUNK):
+                chunk = stale[i:i + _QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                conn.execute(f"DELETE FROM hits WHERE test_id IN ({placeholders})", chunk)
+                conn.execute(f"DELETE FROM tests WHERE test_id IN ({placeholders})", chunk)
+    return len(per_test)
+
+_HUNK_PATTERN = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+\d+(?:,\d+)? @@")
+
+def changed_lines_since(commit: str) -> dict:
+    """{path: set of line numbers in `commit`} touched by the diff from `commit` to the working tree.
+
+    Line numbers are on the old side, matching the indexed commit. A pure
+    insertion maps to the lines around it.
+    """
+    changed = {}
+    current = None
+    for line in _git("diff", "--unified=0", "--no-color", "--no-ext-diff", commit).splitlines():
+        if line.startswith("--- "):
+            path = line[4:]
+            current = changed.setdefault(path[2:], set()) if path.startswith("a/") else None
+        elif line.startswith("+++ ") and current is None:
+            path = line[4:]
+            if path.startswith("b/"):
+                changed.setdefault(path[2:], set())  # New file: nothing indexed yet
+        elif line.startswith("@@") and current is not None:
+            match = _HUNK_PATTERN.match(line)
+            if match:
+                start, count = int(match.group(1)), int(match.group(2) or "1")
+                current.update(range(start, start + count) if count else (start, start + 1))
+    return changed
+
+def _chunks(values: list):
+    for i in range(0, len(values), _QUERY_CHUNK):
+        yield values[i:i + _QUERY_CHUNK]
+
+def _select_for_diff(conn: sqlite3.Connection, commit: str, changed: dict, selected: set):
+    """Adds the tests recorded at `commit` that `changed` affects; returns a reason when a full run is needed."""
+    for path, lines in changed.items():
+        if any(pattern.search(path) for pattern in FULL_RUN_PATTERNS):
+            return f"{path} changed"
+        if not path.endswith(".py"):
+            continue
+        if TEST_FILE_PATTERN.search(path):
+            # Changed or new test file: run it whole (also picks up new tests); deleted ones are skipped
+            if Path(path).exists():
+                selected.add(path)
+            continue
+        file_row = conn.execute("SELECT file_id, module_commit_sha FROM files WHERE path = ?", (path,)).fetchone()
+        if file_row is None:
+            return f"{path} has no coverage history"
+        file_id, module_commit = file_row
+        line_list = sorted(lines)
+        module_level = module_commit == commit and any(conn.execute(
+            f"SELECT 1 FROM module_lines WHERE file_id = ? AND lineno IN ({','.join('?' * len(chunk))}) LIMIT 1",
+            (file_id, *chunk),
+        ).fetchone() for chunk in _chunks(line_list))
+        if module_level:
+            # def/class headers, decorators, constants and imports have no per-test context:
+            # every test that touches the file may be affected
+            touching = [nodeid for (nodeid,) in conn.execute(
+                "SELECT DISTINCT t.nodeid FROM hits h JOIN tests t ON t.test_id = h.test_id WHERE h.file_id = ?",
+                (file_id,),
+            )]
+            if not touching:
+                return f"module-level code of {path} changed and no indexed test touches it"
+            selected.update(touching)
+            continue
+        for chunk in _chunks(line_list):
+            selected.update(nodeid for (nodeid,) in conn.execute(
+                f"SELECT DISTINCT t.nodeid FROM hits h JOIN tests t ON t.test_id = h.test_id "
+                f"WHERE h.file_id = ? AND t.commit_sha = ? AND h.lineno IN ({','.join('?' * len(chunk))})",
+                (file_id, commit, *chunk),
+            ))
+    return None
+
+def select_tests(conn: sqlite3.Connection) -> tuple:
+    """Returns (selection, reason); selection is None when a full run is needed.
+
+    The working tree is diffed once against each commit the index holds line
+    numbers for, and each diff is only matched against rows from that commit.
+    """
+    commits = {commit for (commit,) in conn.execute(
+        "SELECT commit_sha FROM tests UNION SELECT module_commit_sha FROM files"
+    ) if commit}
+    if not commits:
+        return None, "index is empty"
+    for commit in commits:
+        try:
+            age = int(_git("rev-list", "--count", f"{commit}..HEAD").strip())
+        except subprocess.CalledProcessError:
+            return None, f"indexed commit {commit[:12]} is not in this checkout"
+        if age > MAX_INDEX_AGE_COMMITS:
+            return None, f"index is {age} commits old"
+
+    selected = set()
+    for commit in sorted(commits):
+        reason = _select_for_diff(conn, commit, changed_lines_since(commit), selected)
+        if reason:
+            return None, reason
+    # Nodeids inside a selected test file are redundant
+    files = {entry for entry in selected if "::" not in entry}
+    return sorted(e for e in selected if e in files or e.split("::", 1)[0] not in files), "ok"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test impact analysis based on per-test coverage contexts.")
+    parser.add_argument("--db", type=Path, default=INDEX_DB_FILE)
+    sub = parser.add_subparsers(dest="command", required=True)
+    update = sub.add_parser("update", help="merge a .coverage file recorded with --cov-context=test")
+    update.add_argument("--coverage-file", type=Path, default=Path(".coverage"))
+    update.add_argument("--prune", action="store_true",
+                        help="drop indexed tests missing from this run (use only with full runs)")
+    select = sub.add_parser("select", help="write the pytest arguments for tests affected by the current diff")
+    select.add_argument("--output", type=Path, help="write one argument per line (pytest @file); default stdout")
+    select.add_argument("--full-run-arg", default="tests", help="argument written when everything must run")
+    args = parser.parse_args(argv)
+
+    conn = open_index(args.db)
+    try:
+        if args.command == "update":
+            print(f"Test impact index updated for {update_index(conn, args.coverage_file, prune=args.prune)} test(s): {args.db}")
+            return
+        selection, reason = select_tests(conn)
+        # Status goes to stderr so stdout can be used directly as the selection
+        if selection is None:
+            print(f"Full run: {reason}", file=sys.stderr)
+            selection = [args.full_run_arg]
+        else:
+            print(f"Selected {len(selection)} test(s)/file(s) affected by the change", file=sys.stderr)
+        text = "".join(f"{entry}\n" for entry in selection)
+        if args.output:
+            args.output.write_text(text)
+        else:
+            print(text, end="")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# Python Example: Append-only Quality Metrics History Store (SQLite)
+# 品質指標の時系列履歴ストア例（トレンドグラフ・Grafana用）
+# Source: quality_dashboard_guide.md (トレンド表示・Grafana連携)
+# Filename in guide: scripts/dashboard_history.py
+
+import argparse
+import json
+import sqlite3
+from pathlib import Path
+
+HISTORY_DB_FILE = Path("./dashboard_history.sqlite")
+
+# Samples are clustered by (metric, branch, time) in a WITHOUT ROWID table, so a
+# range query for one metric is a single sequential index scan.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS branches (
+    branch_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS metric_names (
+    metric_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    ts INTEGER NOT NULL,
+    commit_sha TEXT NOT NULL,
+    branch_id INTEGER NOT NULL REFERENCES branches(branch_id)
+);
+CREATE INDEX IF NOT EXISTS runs_by_branch_ts ON runs(branch_id, ts);
+CREATE INDEX IF NOT EXISTS runs_by_commit ON runs(commit_sha);
+CREATE TABLE IF NOT EXISTS samples (
+    metric_id INTEGER NOT NULL,
+    branch_id INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    run_id INTEGER NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (metric_id, branch_id, ts, run_id)
+) WITHOUT ROWID;
+-- Flat view for Grafana's SQLite data source
+CREATE VIEW IF NOT EXISTS metric_series AS
+    SELECT s.ts AS time, m.name AS metric, b.name AS branch, r.commit_sha AS commit_sha, s.value AS value
+    FROM samples s
+    JOIN metric_names m ON m.metric_id = s.metric_id
+    JOIN branches b ON b.branch_id = s.branch_id
+    JOIN runs r ON r.run_id = s.run_id;
+"""
+
+# Per-file/package/rule/tool breakdowns grow with the codebase and tool setup; only the
+# fixed set of summary metrics is kept so each run adds a bounded number of rows
+DEFAULT_SKIP_KEYS = frozenset({
+    "files", "packages", "by_rule", "raw_by_tool", "parser_errors", "generation_timestamp",
+})
+
+AGGREGATES = {"avg": "AVG", "min": "MIN", "max": "MAX", "last": "MAX"}
+
+def open_history(db_file: Path = HISTORY_DB_FILE) -> sqlite3.Connection:
+    """Opens (and if needed creates) the history database."""
+    db_file.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_file))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def flatten_metrics(data: dict, prefix: str = "", skip_keys=DEFAULT_SKIP_KEYS):
+    """Yields (dotted name, value) for every numeric leaf of the dashboard data."""
+    for key, value in data.items():
+        if key in skip_keys:
+            continue
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from flatten_metrics(value, f"{name}.", skip_keys)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, float(value)
+
+def _lookup_id(conn: sqlite3.Connection, table: str, id_column: str, name: str, create: bool = True):
+    row = conn.execute(f"SELECT {id_column} FROM {table} WHERE name = ?", (name,)).fetchone()
+    if row is not None:
+        return row[0]
+    if not create:
+        return None
+    return conn.execute(f"INSERT INTO {table} (name) VALUES (?)", (name,)).lastrowid
+
+def append_run(conn: sqlite3.Connection, dashboard_data: dict, commit_sha: str, branch: str, ts: int) -> int:
+    """Appends one run and all of its numeric metrics; returns the new run id."""
+    with conn:
+        branch_id = _lookup_id(conn, "branches", "branch_id", branch)
+        run_id = conn.execute(
+            "INSERT INTO runs (ts, commit_sha, branch_id) VALUES (?, ?, ?)", (ts, commit_sha, branch_id)
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO samples (metric_id, branch_id, ts, run_id, value) VALUES (?, ?, ?, ?, ?)",
+            (
+                (_lookup_id(conn, "metric_names", "metric_id", name), branch_id, ts, run_id, value)
+                for name, value in flatten_metrics(dashboard_data)
+            ),
+        )
+    return run_id
+
+def query_range(conn: sqlite3.Connection, metric: str, branch: str, start: int = 0, end: int = 2**62):
+    """Yields (ts, value) for one metric/branch in [start, end), oldest first."""
+    metric_id = _lookup_id(conn, "metric_names", "metric_id", metric, create=False)
+    branch_id = _lookup_id(conn, "branches", "branch_id", branch, create=False)
+    if metric_id is None or branch_id is None:
+        return
+    yield from conn.execute(
+        "SELECT ts, value FROM samples WHERE metric_id = ? AND branch_id = ? AND ts >= ? AND ts < ? ORDER BY ts",
+        (metric_id, branch_id, start, end),
+    )
+
+def query_downsampled(conn: sqlite3.Connection, metric: str, branch: str, bucket_seconds: int,
+                      start: int = 0, end: int = 2**62, agg: str = "avg"):
+    """Yields (bucket start ts, aggregated value) with one row per `bucket_seconds` bucket."""
+    if agg not in AGGREGATES:
+        raise ValueError(f"Unsupported aggregate '{agg}', expected one of {sorted(AGGREGATES)}")
+    metric_id = _lookup_id(conn, "metric_names", "metric_id", metric, create=False)
+    branch_id = _lookup_id(conn, "branches", "branch_id", branch, create=False)
+    if metric_id is None or branch_id is None:
+        return
+    if agg == "last":
+        # SQLite returns the bare column from the row holding MAX(ts)
+        select = "SELECT (ts / :bucket) * :bucket AS bucket, value, MAX(ts)"
+    else:
+        select = f"SELECT (ts / :bucket) * :bucket AS bucket, {AGGREGATES[agg]}(value)"
+    rows = conn.execute(
+        f"{select} FROM samples WHERE metric_id = :metric AND branch_id = :branch AND ts >= :start AND ts < :end "
+        "GROUP BY bucket ORDER BY bucket",
+        {"bucket": bucket_seconds, "metric": metric_id, "branch": branch_id, "start": start, "end": end},
+    )
+    for row in rows:
+        yield row[0], row[1]
+
+def list_metrics(conn: sqlite3.Connection) -> list:
+    return [name for (name,) in conn.execute("SELECT name FROM metric_names ORDER BY name")]
+
+def export_series(conn: sqlite3.Connection, output_dir: Path, metrics: list, branch: str,
+                  bucket_seconds: int = 86400, agg: str = "avg") -> list:
+    """Writes one `<metric>.json` file of [[ts, value], ...] per metric for the static HTML.
+
+    Rows are streamed from the cursor straight to the file, so the full
+    history is never held in memory. Returns the written file paths.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for metric in metrics:
+        out_file = output_dir / f"{metric}.json"
+        with open(out_file, "w") as f:
+            f.write("[")
+            for i, (ts, value) in enumerate(query_downsampled(conn, metric, branch, bucket_seconds, agg=agg)):
+                f.write(f"{',' if i else ''}[{ts},{json.dumps(value)}]")
+            f.write("]")
+        written.append(out_file)
+    return written
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query or export the quality metrics history.")
+    parser.add_argument("--db", type=Path, default=HISTORY_DB_FILE)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("metrics", help="list recorded metric names")
+    query = sub.add_parser("query", help="print a (downsampled) series as JSON lines")
+    query.add_argument("metric")
+    query.add_argument("--branch", default="main")
+    query.add_argument("--start", type=int, default=0)
+    query.add_argument("--end", type=int, default=2**62)
+    query.add_argument("--bucket", type=int, default=0, help="bucket size in seconds (0 = raw samples)")
+    query.add_argument("--agg", choices=sorted(AGGREGATES), default="avg")
+    export = sub.add_parser("export", help="write per-metric JSON series files")
+    export.add_argument("output_dir", type=Path)
+    export.add_argument("--branch", default="main")
+    export.add_argument("--bucket", type=int, default=86400)
+    export.add_argument("--metric", action="append", help="metric to export (default: all)")
+    args = parser.parse_args(argv)
+
+    conn = open_history(args.db)
+    try:
+        if args.command == "metrics":
+            for name in list_metrics(conn):
+                print(name)
+        elif args.command == "query":
+            if args.bucket:
+                rows = query_downsampled(conn, args.metric, args.branch, args.bucket, args.start, args.end, args.agg)
+            else:
+                rows = query_range(conn, args.metric, args.branch, args.start, args.end)
+            for ts, value in rows:
+                print(json.dumps([ts, value]))
+        elif args.command == "export":
+            for out_file in export_series(conn, args.output_dir, args.metric or list_metrics(conn),
+                                          args.branch, args.bucket):
+                print(f"Exported: {out_file}")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -3,116 +3,1232 @@
 # Source: project_management_guide.md (section 3.3 CI/CDパイプラインとの統合)
 # Filename in guide: scripts/generate_dashboard.py
 
-import json
-import xml.etree.ElementTree as ET
+import os
+import re
+import sys
+import time
+from collections import Counter, namedtuple
+
+# Only modules every invocation needs are imported here; json, ElementTree, hashlib,
+# multiprocessing, the history store and the security normalizer are imported inside
+# the functions that use them, so a run only pays for the reports that actually exist.
+# 起動時間の計測: python generate_dashboard.py --profile-startup
+STARTUP_TARGET_SECONDS = 0.1
+_SCRIPT_STARTED = time.perf_counter()
+_IMPORT_TIMES = []  # (seconds, nesting depth, module, offset from script start)
+_first_work_at = None
+
+def _install_import_timer():
+    """Times the first import of every module from this point on (inclusive of nested imports)."""
+    import builtins
+
+    original_import = builtins.__import__
+    depth = 0
+
+    def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+        nonlocal depth
+        if level or name in sys.modules:
+            return original_import(name, globals, locals, fromlist, level)
+        started = time.perf_counter()
+        depth += 1
+        try:
+            return original_import(name, globals, locals, fromlist, level)
+        finally:
+            depth -= 1
+            _IMPORT_TIMES.append((time.perf_counter() - started, depth, name, started - _SCRIPT_STARTED))
+
+    builtins.__import__ = timed_import
+
+if "--profile-startup" in sys.argv:
+    _install_import_timer()
+
 from pathlib import Path
-import datetime
 
 # Define paths to report files (these would typically be artifacts from CI)
 REPORTS_DIR = Path("./reports_input") # Assume reports are copied here by CI
 COVERAGE_XML_FILE = REPORTS_DIR / "coverage.xml"
 PYLINT_JSON_FILE = REPORTS_DIR / "pylint-report.json"
 FLAKE8_TXT_FILE = REPORTS_DIR / "flake8-report.txt"
+# Written by reference_pytest_duration_profiler_plugin.py (pytest --durations-jsonl=...)
+TEST_DURATIONS_JSONL_FILE = REPORTS_DIR / "test-durations.jsonl"
+# Security reports (SAST/SCA/DAST/secrets), keyed by the normalizer's tool name
+SECURITY_REPORT_FILES = {
+    "bandit": REPORTS_DIR / "bandit-report.json",
+    "semgrep": REPORTS_DIR / "semgrep-report.json",
+    "pip-audit": REPORTS_DIR / "pip-audit-report.json",
+    "trivy": REPORTS_DIR / "trivy-report.json",
+    "zap": REPORTS_DIR / "zap-report.json",
+    "detect-secrets": REPORTS_DIR / "detect-secrets-report.json",
+}
 
 OUTPUT_DIR = Path("./dashboard_output")
 OUTPUT_JSON_FILE = OUTPUT_DIR / "dashboard_data.json"
 OUTPUT_HTML_FILE = OUTPUT_DIR / "quality_dashboard.html"
+COVERAGE_DIFF_FILE = OUTPUT_DIR / "coverage_diff.json"
+
+# Parse results and the last rendered metrics digest are cached next to OUTPUT_DIR
+CACHE_DIR = Path("./.dashboard_cache")
+RENDER_STATE_FILE = CACHE_DIR / "render_state.json"
+# Per-file line hits written while parsing coverage.xml; --diff-base looks up changed files here
+COVERAGE_LINE_INDEX_FILE = CACHE_DIR / "coverage_lines.sqlite"
+
+# Append-only metrics history; trend series are exported under OUTPUT_DIR for the HTML/Grafana
+HISTORY_DB_FILE = Path("./dashboard_history.sqlite")  # Same default as scripts/dashboard_history.py
+HISTORY_EXPORT_DIR = OUTPUT_DIR / "history"
+TREND_METRICS = [
+    "coverage.coverage_percentage",
+    "pylint.total_issues",
+    "flake8.total_issues",
+    "security.by_severity.critical",
+    "security.by_severity.high",
+    "security.total_unique",
+    "test_durations.total_seconds",
+    "test_durations.wall_seconds",
+]
 
-def parse_coverage_xml(file_path: Path) -> dict:
-    # coverage.xmlからカバレッジ情報を抽出
-    # ...（実装例は省略）
-    return {"coverage": 85.0}
+# Number of rules/files listed as hotspots in the lint summaries
+LINT_TOP_N = 20
+# flake8 default format: path:row:col: CODE message
+FLAKE8_LINE_PATTERN = re.compile(r"^(.+?):\d+:\d+: (\S+)", re.MULTILINE)
 
-def parse_pylint_json(file_path: Path) -> dict:
-    # pylint-report.jsonから警告・エラー数を集計
-    # ...（実装例は省略）
-    return {"pylint_score": 9.2, "errors": 1, "warnings": 3}
+# func(*input_files) -> dict; `default` is used when the parser fails or has no input.
+# `digest_arg` names a keyword argument that receives the first input's SHA-256 when the
+# cache has already computed it, so the parser does not hash the file a second time.
+# (collections.namedtuple instead of typing.NamedTuple: typing alone costs ~5 ms to import)
+ParserSpec = namedtuple("ParserSpec", "func input_files default version digest_arg")
 
-def parse_flake8_txt(file_path: Path) -> dict:
-    """Parses flake8 text report to count total issues."""
-    data = {"total_issues": 0}
+# Parser registry: name -> ParserSpec
+# 各パーサーは入力ファイルを位置引数で受け取り、dashboard_data[name] に入るdictを返す
+# 入力ファイルがなければ既定値を返し、壊れた入力では例外を送出する（run_parsersがparser_errorsに記録し、結果はキャッシュされない）
+# パーサー固有の依存モジュールは関数内でimportする（入力ファイルがある場合のみ読み込まれる）
+PARSER_REGISTRY = {}
+
+def register_parser(name: str, *input_files: Path, default: dict = None, version: int = 1, digest_arg: str = None):
+    """Registers a report parser under `name`; `default` is used when the parser fails.
+
+    Bump `version` whenever the parser's output changes so cached results are discarded.
+    """
+    def decorator(func):
+        PARSER_REGISTRY[name] = ParserSpec(func, input_files, dict(default or {}), version, digest_arg)
+        return func
+    return decorator
+
+def _coverage_totals(lines_total: int, lines_covered: int) -> dict:
+    """Builds a totals entry with a percentage derived from line counts."""
+    percentage = (lines_covered / lines_total * 100.0) if lines_total else 0.0
+    return {
+        "lines_total": lines_total,
+        "lines_covered": lines_covered,
+        "coverage_percentage": round(percentage, 2),
+    }
+
+_LINE_INDEX_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE lines (filename TEXT NOT NULL, data BLOB NOT NULL);
+CREATE INDEX lines_by_file ON lines(filename);
+"""
+
+@register_parser("coverage", COVERAGE_XML_FILE, version=2, digest_arg="source_digest",
+                 default={"lines_total": 0, "lines_covered": 0, "coverage_percentage": 0.0})
+def parse_coverage_xml(file_path: Path, line_index: Path = COVERAGE_LINE_INDEX_FILE, source_digest: str = None) -> dict:
+    """Parses a Cobertura coverage.xml incrementally into overall, per-package and per-file totals.
+
+    Elements are cleared and detached from their parent as soon as they have been
+    counted, so memory stays flat regardless of the report size. Unless
+    `line_index` is None, the per-line hits of every <class> are also written
+    to that SQLite file, keyed by filename, for compute_coverage_diff;
+    `source_digest` (the file's SHA-256, if already known) saves re-hashing it.
+    """
+    # coverage.xmlをiterparseで逐次読み込み、<line>要素を処理済みのものから破棄する
+    import xml.etree.ElementTree as ET
+
+    data = _coverage_totals(0, 0)
+    data.update({"packages": {}, "files": {}})
+    index_conn = tmp_index = None
     try:
         if not file_path.exists():
-            print(f"Warning: Flake8 report not found: {file_path}")
+            print(f"Warning: Coverage report not found: {file_path}")
             return data
-        with open(file_path, 'r') as f:
+        if line_index is not None:
+            import array
+            import json
+            import sqlite3
+
+            source_stamp = _coverage_source_stamp(file_path, source_digest)
+            line_index.parent.mkdir(parents=True, exist_ok=True)
+            tmp_index = line_index.with_name(line_index.name + ".tmp")
+            tmp_index.unlink(missing_ok=True)
+            index_conn = sqlite3.connect(str(tmp_index))
+            index_conn.executescript(_LINE_INDEX_SCHEMA)
+            class_lines = array.array("I")  # line, hits, line, hits, ...
+        packages = data["packages"]
+        files = data["files"]
+        stack = []  # Open ancestors, used to detach finished children
+        package_name = None
+        filename = None
+        in_method = False
+        file_total = file_covered = 0
+        for event, elem in ET.iterparse(str(file_path), events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                stack.append(elem)
+                if tag == "package":
+                    package_name = elem.get("name", "")
+                    packages.setdefault(package_name, [0, 0])
+                elif tag == "class":
+                    filename = elem.get("filename", "")
+                    file_total = file_covered = 0
+                    if index_conn is not None:
+                        del class_lines[:]
+                elif tag == "method":
+                    in_method = True
+                continue
+
+            stack.pop()
+            if tag == "line":
+                # Method-level <line> entries duplicate the class-level ones
+                if filename is not None and not in_method:
+                    file_total += 1
+                    hits = elem.get("hits", "0")
+                    if hits != "0":
+                        file_covered += 1
+                    if index_conn is not None:
+                        class_lines.append(int(elem.get("number", "0")))
+                        class_lines.append(int(hits))
+            elif tag == "method":
+                in_method = False
+            elif tag == "class":
+                # A source file may be split over several <class> entries
+                totals = files.setdefault(filename, [0, 0])
+                totals[0] += file_total
+                totals[1] += file_covered
+                if package_name is not None:
+                    packages[package_name][0] += file_total
+                    packages[package_name][1] += file_covered
+                if index_conn is not None:
+                    index_conn.execute("INSERT INTO lines (filename, data) VALUES (?, ?)",
+                                       (filename, class_lines.tobytes()))
+                filename = None
+            elif tag == "package":
+                package_name = None
+            elem.clear()
+            if stack:
+                stack[-1].remove(elem)
+
+        lines_total = sum(total for total, _ in files.values())
+        lines_covered = sum(covered for _, covered in files.values())
+        data.update(_coverage_totals(lines_total, lines_covered))
+        data["packages"] = {name: _coverage_totals(*counts) for name, counts in packages.items()}
+        data["files"] = {name: _coverage_totals(*counts) for name, counts in files.items()}
+        if index_conn is not None:
+            index_conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", (
+                ("source", json.dumps(source_stamp)),
+                ("lines_total", str(lines_total)),
+                ("lines_covered", str(lines_covered)),
+            ))
+            index_conn.commit()
+            index_conn.close()
+            index_conn = None
+            os.replace(tmp_index, line_index)
+    finally:
+        if index_conn is not None:
+            # 解析に失敗した場合は不完全なインデックスを残さない
+            index_conn.close()
+            tmp_index.unlink(missing_ok=True)
+    return data
+
+def _coverage_source_stamp(file_path: Path, digest: str = None) -> dict:
+    """Identifies the coverage.xml a line index was built from (size, mtime and SHA-256)."""
+    stat = file_path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": digest or _file_digest(file_path)}
+
+class _JsonChunkReader:
+    """Decodes consecutive JSON values from a file read in chunks of `chunk_size` characters."""
+
+    def __init__(self, f, chunk_size: int):
+        import json
+
+        self._f = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._error = json.JSONDecodeError
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        # Drop consumed text and append the next chunk
+        chunk = self._f.read(self._chunk_size)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+
+    def peek(self, skip: str = " \t\r\n") -> str:
+        """Skips `skip` characters and returns the next one ("" at end of file)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in skip:
+                self.pos += 1
+            if self.pos < len(self.buffer) or self.eof:
+                return self.buffer[self.pos:self.pos + 1]
+            self._fill()
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"expected '{char}' at offset {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                item, self.pos = self._decoder.raw_decode(self.buffer, self.pos)
+                return item
+            except self._error:
+                # Value straddles the chunk boundary: read more
+                if self.eof:
+                    raise
+                self._fill()
+
+    def array_items(self):
+        """Yields the items of the array starting at the current position."""
+        self.expect("[")
+        while True:
+            char = self.peek(" \t\r\n,")
+            if char == "]":
+                self.pos += 1
+                return
+            if not char:
+                raise ValueError("unterminated JSON array")
+            yield self.value()
+
+def _iter_json_array(file_path: Path, chunk_size: int = 1 << 20):
+    """Yields the items of a top-level JSON array without loading the whole file."""
+    with open(file_path, "r") as f:
+        yield from _JsonChunkReader(f, chunk_size).array_items()
+
+def _iter_json_members(file_path: Path, stream_key: str, chunk_size: int = 1 << 20):
+    """Yields (key, value) for the members of a top-level JSON object without loading the whole file.
+
+    The array under `stream_key` is not decoded as a whole: each of its items
+    is yielded as a separate (stream_key, item) pair.
+    """
+    with open(file_path, "r") as f:
+        reader = _JsonChunkReader(f, chunk_size)
+        reader.expect("{")
+        while True:
+            char = reader.peek(" \t\r\n,")
+            if char == "}":
+                return
+            if not char:
+                raise ValueError("unterminated JSON object")
+            key = reader.value()
+            reader.expect(":")
+            if key == stream_key and reader.peek() == "[":
+                for item in reader.array_items():
+                    yield key, item
+            else:
+                yield key, reader.value()
+
+def _lint_summary(total: int, by_type: Counter, by_rule: Counter, by_file: Counter, top_n: int) -> dict:
+    """Builds the common lint summary shape shared by the pylint and flake8 parsers."""
+    return {
+        "total_issues": total,
+        "by_type": dict(by_type),
+        "by_rule": dict(by_rule),
+        "files_with_issues": len(by_file),
+        "top_rules": [{"rule": rule, "count": count} for rule, count in by_rule.most_common(top_n)],
+        "top_files": [{"file": name, "count": count} for name, count in by_file.most_common(top_n)],
+    }
+
+@register_parser("pylint", PYLINT_JSON_FILE, version=2,
+                 default={"total_issues": 0, "errors": 0, "warnings": 0, "refactor": 0, "convention": 0})
+def parse_pylint_json(file_path: Path, top_n: int = LINT_TOP_N) -> dict:
+    """Aggregates a pylint JSON report by message type, rule (symbol) and file in one streaming pass.
+
+    Accepts both the classic `json` format (a top-level array) and `json2`
+    (an object with `messages` and `statistics`, which also carries the score).
+    Both are streamed; messages are never held in memory all at once.
+    """
+    # pylint-report.jsonから警告・エラー数を集計（メッセージ種別・ルール・ファイル別）
+    by_type, by_rule, by_file = Counter(), Counter(), Counter()
+    total = 0
+    score = None
+    if not file_path.exists():
+        print(f"Warning: Pylint report not found: {file_path}")
+    else:
+        with open(file_path, "r") as f:
+            is_json2 = f.read(64).lstrip().startswith("{")
+        if is_json2:
+            members = _iter_json_members(file_path, "messages")
+        else:
+            members = (("messages", message) for message in _iter_json_array(file_path))
+        for key, value in members:
+            if key == "statistics" and isinstance(value, dict):
+                score = value.get("score")
+            elif key == "messages":
+                total += 1
+                by_type[value.get("type", "unknown")] += 1
+                by_rule[value.get("symbol") or value.get("message-id", "unknown")] += 1
+                by_file[value.get("path", "")] += 1
+    data = _lint_summary(total, by_type, by_rule, by_file, top_n)
+    # generate_html_reportが参照する種別ごとの件数
+    data.update({
+        "errors": by_type["error"] + by_type["fatal"],
+        "warnings": by_type["warning"],
+        "refactor": by_type["refactor"],
+        "convention": by_type["convention"],
+    })
+    if score is not None:
+        data["pylint_score"] = score
+    return data
+
+@register_parser("flake8", FLAKE8_TXT_FILE, version=2, default={"total_issues": 0})
+def parse_flake8_txt(file_path: Path, top_n: int = LINT_TOP_N, chunk_size: int = 1 << 20) -> dict:
+    """Aggregates a flake8 text report by code prefix, rule code and file.
+
+    The report is read in line-aligned chunks; each chunk is matched with one
+    `findall` and counted with `Counter.update`, so the per-finding work stays
+    in C and memory is bounded by the chunk size plus the distinct (file, code) pairs.
+    """
+    pairs = Counter()
+    if not file_path.exists():
+        print(f"Warning: Flake8 report not found: {file_path}")
+    else:
+        with open(file_path, "r") as f:
+            remainder = ""
+            while True:
+                chunk = f.read(chunk_size)
+                text = remainder + chunk
+                if chunk:
+                    # Keep the trailing partial line for the next chunk
+                    cut = text.rfind("\n") + 1
+                    text, remainder = text[:cut], text[cut:]
+                pairs.update(FLAKE8_LINE_PATTERN.findall(text))
+                if not chunk:
+                    break
+    by_type, by_rule, by_file = Counter(), Counter(), Counter()
+    for (path, code), count in pairs.items():
+        by_type[code[:1]] += count
+        by_rule[code] += count
+        by_file[path] += count
+    return _lint_summary(sum(pairs.values()), by_type, by_rule, by_file, top_n)
+
+# Synthetic flake8 report shape: findings spread over this many files (a large monorepo);
+# with 6 codes that is at most 12,000 distinct (file, code) pairs however many findings there are
+BENCHMARK_LINT_FILES = 2_000
+
+def benchmark_flake8_parsing(num_findings: int, work_dir: Path = None) -> dict:
+    """Compares parse_flake8_txt with the previous readlines-based count on a synthetic report.
+
+    The trade-off being measured: readlines only counts lines, holding the
+    whole report in memory; parse_flake8_txt also aggregates by rule and file
+    with peak memory independent of the report size, and the regex match per
+    line makes it several times slower than the bare count.
+    """
+    import tempfile
+    import tracemalloc
+
+    def count_with_readlines(file_path: Path) -> int:
+        with open(file_path, "r") as f:
             lines = f.readlines()
-        data["total_issues"] = len([line for line in lines if line.strip()])
-    except Exception as e:
-        print(f"Error parsing Flake8 TXT: {e}")
+        return len([line for line in lines if line.strip()])
+
+    codes = ("E501", "W291", "F401", "E302", "C901", "W605")
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        report = Path(tmp) / "flake8-report.txt"
+        with open(report, "w") as f:
+            for i in range(num_findings):
+                file_index = i % BENCHMARK_LINT_FILES
+                f.write(f"src/pkg{file_index % 50}/module_{file_index}.py:{i % 400 + 1}:{i % 80 + 1}: "
+                        f"{codes[i % len(codes)]} synthetic finding {i}\n")
+        results = {"num_findings": num_findings, "report_mib": round(report.stat().st_size / 2**20, 1)}
+        for label, func in (("readlines", count_with_readlines), ("streaming", parse_flake8_txt)):
+            # Time and memory are measured in separate passes: tracemalloc slows allocation-heavy code
+            started = time.perf_counter()
+            func(report)
+            elapsed = time.perf_counter() - started
+            tracemalloc.start()
+            func(report)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[label] = {"seconds": round(elapsed, 3), "peak_mib": round(peak / 2**20, 1)}
+    return results
+
+@register_parser("security", *SECURITY_REPORT_FILES.values(),
+                 default={"total_unique": 0, "by_severity": {}, "by_category": {}})
+def parse_security_reports(*file_paths: Path) -> dict:
+    """Normalizes all security reports into one deduplicated index and returns its severity counts."""
+    # 同一CVE・同一指摘はツールをまたいで1件として数える
+    try:
+        import security_findings  # scripts/security_findings.py
+    except ImportError:
+        import reference_security_findings_normalizer as security_findings
+
+    report_files = dict(zip(SECURITY_REPORT_FILES, file_paths))
+    return security_findings.normalize_reports(report_files, strict=True).summary()
+
+# Dashboard page template; {{ name }} slots are HTML-escaped, {{ name|raw }} slots are written as-is.
+# レイアウトは reference_dashboard_html_example.html（header + dashboard-grid + card）に準拠
+DASHBOARD_TEMPLATE = """<!DOCTYPE html>
+<html lang="ja">
+<head>
+  <meta charset="UTF-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  <title>プロジェクト品質ダッシュボード</title>
+  <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+  <style>
+    body { font-family: sans-serif; margin: 20px; background-color: #f4f4f4; color: #333; }
+    header h1 { color: #333; border-bottom: 2px solid #4CAF50; padding-bottom: 10px; }
+    .dashboard-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(320px, 1fr)); gap: 20px; }
+    .card { background-color: #fff; padding: 20px; border-radius: 8px; box-shadow: 0 0 10px rgba(0,0,0,0.1); }
+    .card.wide { grid-column: 1 / -1; }
+    .metric { font-size: 1.6em; font-weight: bold; }
+    table { width: 100%; border-collapse: collapse; margin-top: 10px; }
+    th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
+    th { background-color: #4CAF50; color: white; }
+    .pager { margin-top: 10px; }
+  </style>
+</head>
+<body>
+  <header>
+    <h1>プロジェクト品質ダッシュボード</h1>
+    <p>最終更新: <span id="last-updated">{{ generation_timestamp }}</span></p>
+  </header>
+  <div class="dashboard-grid">
+    <div class="card">
+      <h2>コードカバレッジ</h2>
+      <span id="total-coverage" class="metric">{{ coverage_percentage }}%</span>
+      <table>
+        <tr><th>Metric</th><th>Value</th></tr>
+        <tr><td>Total Lines</td><td>{{ lines_total }}</td></tr>
+        <tr><td>Covered Lines</td><td>{{ lines_covered }}</td></tr>
+      </table>
+      <canvas id="coverage-trend-chart" data-series="history/coverage.coverage_percentage.json"></canvas>
+    </div>
+    <div class="card">
+      <h2>コード品質スコア</h2>
+      <span id="code-quality-score" class="metric">{{ pylint_score }}</span>
+      <table>
+        <tr><th>Type</th><th>Pylint</th></tr>
+        <tr><td>Errors</td><td>{{ pylint_errors }}</td></tr>
+        <tr><td>Warnings</td><td>{{ pylint_warnings }}</td></tr>
+        <tr><td>Refactor</td><td>{{ pylint_refactor }}</td></tr>
+        <tr><td>Convention</td><td>{{ pylint_convention }}</td></tr>
+        <tr><td>Flake8 Issues</td><td>{{ flake8_total_issues }}</td></tr>
+      </table>
+      <canvas id="code-quality-chart" data-series="history/pylint.total_issues.json"></canvas>
+    </div>
+    <div class="card">
+      <h2>セキュリティ脆弱性</h2>
+      <div>SAST: <span id="sast-high">{{ sast_high }}</span> High, <span id="sast-medium">{{ sast_medium }}</span> Med</div>
+      <table>
+        <tr><th>Severity</th><th>Unique findings</th></tr>
+        {{ security_rows|raw }}
+      </table>
+      <canvas id="vulnerability-trend-chart" data-series="history/security.by_severity.high.json"></canvas>
+    </div>
+    <div class="card wide">
+      <h2>ファイル別カバレッジ</h2>
+      <table id="coverage-files" data-shards="{{ coverage_files_shards }}" data-pages="{{ coverage_files_pages }}">
+        <thead><tr><th>File</th><th>Total Lines</th><th>Covered Lines</th><th>Coverage %</th></tr></thead>
+        <tbody>
+        {{ coverage_files_first_page|raw }}
+        </tbody>
+      </table>
+      <div class="pager" data-table="coverage-files"></div>
+    </div>
+  </div>
+  <script>
+    // Trend charts: each canvas loads its downsampled series exported by the history store
+    document.querySelectorAll("canvas[data-series]").forEach(function (canvas) {
+      fetch(canvas.dataset.series).then(function (r) { return r.ok ? r.json() : []; }).then(function (points) {
+        if (!points.length || typeof Chart === "undefined") { return; }
+        new Chart(canvas, {
+          type: "line",
+          data: {
+            labels: points.map(function (p) { return new Date(p[0] * 1000).toISOString().slice(0, 10); }),
+            datasets: [{ data: points.map(function (p) { return p[1]; }), borderColor: "#4CAF50", fill: false }]
+          },
+          options: { plugins: { legend: { display: false } } }
+        });
+      }).catch(function () {});
+    });
+    // Large tables: page 0 is rendered inline, further pages are fetched from JSON shards on demand
+    document.querySelectorAll(".pager[data-table]").forEach(function (pager) {
+      var table = document.getElementById(pager.dataset.table);
+      var pages = parseInt(table.dataset.pages, 10);
+      if (pages <= 1) { return; }
+      var current = 0;
+      var label = document.createElement("span");
+      function show(page) {
+        var url = table.dataset.shards + "-" + String(page).padStart(4, "0") + ".json";
+        fetch(url).then(function (r) { return r.json(); }).then(function (rows) {
+          var body = table.tBodies[0];
+          body.textContent = "";
+          rows.forEach(function (row) {
+            var tr = body.insertRow();
+            row.forEach(function (cell) { tr.insertCell().textContent = cell; });
+          });
+          current = page;
+          label.textContent = " " + (page + 1) + " / " + pages + " ";
+        });
+      }
+      [["<", -1], [">", 1]].forEach(function (spec, i) {
+        var button = document.createElement("button");
+        button.textContent = spec[0];
+        button.onclick = function () {
+          var next = current + spec[1];
+          if (next >= 0 && next < pages) { show(next); }
+        };
+        pager.appendChild(button);
+        if (i === 0) { pager.appendChild(label); }
+      });
+      label.textContent = " 1 / " + pages + " ";
+    });
+  </script>
+</body>
+</html>
+"""
+
+_TEMPLATE_SLOT_PATTERN = re.compile(r"{{\s*(\w+)(\|raw)?\s*}}")
+
+def compile_template(template: str) -> list:
+    """Splits a template once into (literal text, slot name, raw) segments."""
+    segments = []
+    pos = 0
+    for match in _TEMPLATE_SLOT_PATTERN.finditer(template):
+        segments.append((template[pos:match.start()], match.group(1), bool(match.group(2))))
+        pos = match.end()
+    segments.append((template[pos:], None, False))
+    return segments
+
+# Compiled at import time so each render only writes literals and slot values
+COMPILED_DASHBOARD_TEMPLATE = compile_template(DASHBOARD_TEMPLATE)
+
+# Rows per table page: page 0 is inlined in the HTML, every page is also a JSON shard
+TABLE_PAGE_SIZE = 500
+
+def render_template(segments: list, context: dict, out):
+    """Streams a compiled template to `out`.
+
+    Lists and generators are written chunk by chunk and must yield ready-made
+    HTML; any other value (None is shown as "N/A") is escaped unless the slot is `|raw`.
+    """
+    import html
+    import types
+
+    for literal, slot, raw in segments:
+        out.write(literal)
+        if slot is None:
+            continue
+        value = context.get(slot)
+        if isinstance(value, (list, types.GeneratorType)):
+            for chunk in value:
+                out.write(chunk)
+        else:
+            text = "N/A" if value is None else str(value)
+            out.write(text if raw else html.escape(text))
+
+def _table_rows_html(rows):
+    import html
+
+    for row in rows:
+        yield "<tr>" + "".join(f"<td>{html.escape(str(cell))}</td>" for cell in row) + "</tr>\n"
+
+def write_table_shards(rows, output_dir: Path, name: str, page_size: int = TABLE_PAGE_SIZE) -> tuple:
+    """Writes rows as `<name>-0000.json`, `<name>-0001.json`, ... and returns (first page, page count)."""
+    import json
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    first_page, page, pages = [], [], 0
+
+    def flush():
+        nonlocal pages
+        with open(output_dir / f"{name}-{pages:04d}.json", "w") as f:
+            json.dump(page, f, separators=(",", ":"))
+        pages += 1
+
+    for row in rows:
+        page.append(row)
+        if len(page) == page_size:
+            if not pages:
+                first_page = page
+            flush()
+            page = []
+    if page or not pages:
+        if not pages:
+            first_page = page
+        flush()
+    # Drop shards left over from an earlier, larger table
+    for stale in output_dir.glob(f"{name}-*.json"):
+        if int(stale.stem.rsplit("-", 1)[1]) >= pages:
+            stale.unlink()
+    return first_page, pages
+
+@register_parser("test_durations", TEST_DURATIONS_JSONL_FILE,
+                 default={"tests": 0, "total_seconds": 0.0, "by_marker": {}})
+def parse_test_durations_jsonl(file_path: Path, top_n: int = LINT_TOP_N) -> dict:
+    """Summarizes the duration profiler's JSONL: totals, per-marker time, slowest tests/fixtures and the 80% tail."""
+    # テスト実行時間: どのテスト・フィクスチャ・マーカーがCI時間を消費しているかを集計
+    import json
+
+    test_seconds = []  # (seconds, nodeid)
+    by_marker = {}
+    fixtures = {}
+    wall_seconds = None
+    if not file_path.exists():
+        print(f"Warning: Test durations report not found: {file_path}")
+    else:
+        with open(file_path, "r") as f:
+            for line in f:
+                record = json.loads(line)
+                kind = record.get("type")
+                if kind == "test":
+                    seconds = record["setup"] + record["call"] + record["teardown"]
+                    test_seconds.append((seconds, record["nodeid"]))
+                    for marker in record.get("markers", []):
+                        stats = by_marker.setdefault(marker, {"tests": 0, "seconds": 0.0})
+                        stats["tests"] += 1
+                        stats["seconds"] += seconds
+                elif kind == "fixture":
+                    key = (record["fixture"], record["scope"])
+                    stats = fixtures.setdefault(key, {"setup_count": 0, "setup_seconds": 0.0, "teardown_seconds": 0.0})
+                    if record["phase"] == "setup":
+                        stats["setup_count"] += 1
+                    stats[f"{record['phase']}_seconds"] += record["seconds"]
+                elif kind == "session":
+                    wall_seconds = record["wall_seconds"]
+
+    total = sum(seconds for seconds, _ in test_seconds)
+    # Smallest number of tests that together account for 80% of the test time
+    test_seconds.sort(reverse=True)
+    running, pareto_count = 0.0, 0
+    for seconds, _ in test_seconds:
+        if running >= total * 0.8:
+            break
+        running += seconds
+        pareto_count += 1
+    slowest_fixtures = sorted(fixtures.items(), key=lambda item: -(item[1]["setup_seconds"] + item[1]["teardown_seconds"]))
+    data = {
+        "tests": len(test_seconds),
+        "total_seconds": round(total, 3),
+        "by_marker": {name: {"tests": s["tests"], "seconds": round(s["seconds"], 3)} for name, s in sorted(by_marker.items())},
+        "slowest_tests": [{"nodeid": nodeid, "seconds": round(seconds, 3)} for seconds, nodeid in test_seconds[:top_n]],
+        "slowest_fixtures": [
+            {"fixture": name, "scope": scope, "setups": s["setup_count"],
+             "setup_seconds": round(s["setup_seconds"], 3), "teardown_seconds": round(s["teardown_seconds"], 3)}
+            for (name, scope), s in slowest_fixtures[:top_n]
+        ],
+        "pareto_80": {
+            "tests": pareto_count,
+            "share_of_tests": round(pareto_count / len(test_seconds) * 100.0, 2) if test_seconds else 0.0,
+        },
+    }
+    if wall_seconds is not None:
+        data["wall_seconds"] = wall_seconds
     return data
 
 def generate_html_report(dashboard_data: dict, output_file: Path):
-    """Generates a simple HTML report from the dashboard data."""
-    html_content = f"""
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Quality Dashboard</title>
-        <style>
-            body {{ font-family: sans-serif; margin: 20px; background-color: #f4f4f4; color: #333; }}
-            .container {{ background-color: #fff; padding: 20px; border-radius: 8px; box-shadow: 0 0 10px rgba(0,0,0,0.1); }}
-            h1 {{ color: #333; border-bottom: 2px solid #4CAF50; padding-bottom: 10px;}}
-            h2 {{ color: #555; margin-top: 30px; }}
-            table {{ width: 100%; border-collapse: collapse; margin-top: 10px; }}
-            th, td {{ border: 1px solid #ddd; padding: 12px; text-align: left; }}
-            th {{ background-color: #4CAF50; color: white; }}
-            .metric {{ font-size: 1.2em; }}
-            .timestamp {{ font-size: 0.9em; color: #777; margin-bottom:20px; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <h1>Quality Dashboard</h1>
-            <p class="timestamp">Report generated on: {dashboard_data['generation_timestamp']}</p>
-            
-            <h2>Test Coverage</h2>
-            <p class="metric">Overall Coverage: <strong>{dashboard_data['coverage']['coverage_percentage']:.2f}%</strong></p>
-            <table>
-                <tr><th>Metric</th><th>Value</th></tr>
-                <tr><td>Total Lines</td><td>{dashboard_data['coverage'].get('lines_total','N/A')}</td></tr>
-                <tr><td>Covered Lines</td><td>{dashboard_data['coverage'].get('lines_covered','N/A')}</td></tr>
-            </table>
-
-            <h2>Static Analysis - Pylint</h2>
-            <p class="metric">Total Pylint Issues: <strong>{dashboard_data['pylint']['total_issues']}</strong></p>
-            <table>
-                <tr><th>Type</th><th>Count</th></tr>
-                <tr><td>Errors</td><td>{dashboard_data['pylint']['errors']}</td></tr>
-                <tr><td>Warnings</td><td>{dashboard_data['pylint']['warnings']}</td></tr>
-                <tr><td>Refactor</td><td>{dashboard_data['pylint']['refactor']}</td></tr>
-                <tr><td>Convention</td><td>{dashboard_data['pylint']['convention']}</td></tr>
-            </table>
-
-            <h2>Static Analysis - Flake8</h2>
-            <p class="metric">Total Flake8 Issues: <strong>{dashboard_data['flake8']['total_issues']}</strong></p>
-
-        </div>
-    </body>
-    </html>
-    """
+    """Streams the dashboard HTML from the precompiled template, sharding large tables as JSON pages."""
+    coverage = dashboard_data.get("coverage", {})
+    pylint = dashboard_data.get("pylint", {})
+    security = dashboard_data.get("security", {})
+    sast = security.get("by_category", {}).get("sast", {})
+    data_dir = output_file.parent / "data"
     try:
+        # カバレッジの低いファイルから順に並べ、ページ単位のJSONシャードに分割
+        files = sorted(coverage.get("files", {}).items(), key=lambda item: item[1]["coverage_percentage"])
+        first_page, pages = write_table_shards(
+            ([name, totals["lines_total"], totals["lines_covered"], totals["coverage_percentage"]]
+             for name, totals in files),
+            data_dir, "coverage_files",
+        )
+        context = {
+            "generation_timestamp": dashboard_data.get("generation_timestamp", "N/A"),
+            "coverage_percentage": f"{coverage.get('coverage_percentage', 0.0):.2f}",
+            "lines_total": coverage.get("lines_total", "N/A"),
+            "lines_covered": coverage.get("lines_covered", "N/A"),
+            "pylint_score": pylint.get("pylint_score", "-.--"),
+            "pylint_errors": pylint.get("errors", "N/A"),
+            "pylint_warnings": pylint.get("warnings", "N/A"),
+            "pylint_refactor": pylint.get("refactor", "N/A"),
+            "pylint_convention": pylint.get("convention", "N/A"),
+            "flake8_total_issues": dashboard_data.get("flake8", {}).get("total_issues", "N/A"),
+            "sast_high": sast.get("critical", 0) + sast.get("high", 0),
+            "sast_medium": sast.get("medium", 0),
+            "security_rows": _table_rows_html(security.get("by_severity", {}).items()),
+            "coverage_files_shards": f"{data_dir.name}/coverage_files",
+            "coverage_files_pages": pages,
+            "coverage_files_first_page": _table_rows_html(first_page),
+        }
         output_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_file, 'w') as f:
-            f.write(html_content)
+        tmp_file = output_file.with_name(output_file.name + ".tmp")
+        with open(tmp_file, "w", encoding="utf-8", buffering=1 << 16) as f:
+            render_template(COMPILED_DASHBOARD_TEMPLATE, context, f)
+        os.replace(tmp_file, output_file)
         print(f"HTML report generated: {output_file}")
     except Exception as e:
         print(f"Error generating HTML report: {e}")
 
-def main():
-    # レポートファイルのパス
-    coverage = parse_coverage_xml(COVERAGE_XML_FILE)
-    pylint = parse_pylint_json(PYLINT_JSON_FILE)
-    # ...他ツールの集計も同様に
+def _parser_worker(name: str, conn, kwargs: dict):
+    """Runs one registered parser in a child process and sends back (ok, payload)."""
+    spec = PARSER_REGISTRY[name]
+    try:
+        conn.send((True, spec.func(*spec.input_files, **kwargs)))
+    except Exception as e:
+        conn.send((False, f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+def run_parsers(names: list, jobs: int = 1, timeout: float = None, parser_kwargs: dict = None) -> tuple:
+    """Runs the named parsers, up to `jobs` at a time in separate processes.
+
+    Each parser gets its own process, so a crash, hang or exception only loses
+    that parser's result. Parsers exceeding `timeout` seconds are terminated.
+    `parser_kwargs` maps a parser name to extra keyword arguments for it.
+    Returns (results, errors), both keyed by parser name.
+    """
+    results, errors = {}, {}
+    parser_kwargs = parser_kwargs or {}
+    if not names:
+        return results, errors
+    if jobs <= 1:
+        # 逐次実行（タイムアウトなし）: デバッグ時や1コア環境向け
+        for name in names:
+            spec = PARSER_REGISTRY[name]
+            try:
+                results[name] = spec.func(*spec.input_files, **parser_kwargs.get(name, {}))
+            except Exception as e:
+                errors[name] = f"{type(e).__name__}: {e}"
+        return results, errors
+
+    import multiprocessing
+    import multiprocessing.connection
+
+    pending = list(names)
+    running = {}  # name -> (process, receiving connection, start time)
+    while pending or running:
+        while pending and len(running) < jobs:
+            name = pending.pop(0)
+            recv_conn, send_conn = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_parser_worker, args=(name, send_conn, parser_kwargs.get(name, {})), daemon=True)
+            process.start()
+            send_conn.close()
+            running[name] = (process, recv_conn, time.monotonic())
+
+        ready = multiprocessing.connection.wait([conn for _, conn, _ in running.values()], timeout=0.1)
+        for name, (process, conn, started) in list(running.items()):
+            if conn in ready:
+                # Receive before join so large payloads cannot block the child
+                try:
+                    ok, payload = conn.recv()
+                except EOFError:
+                    ok, payload = False, f"parser process exited with code {process.exitcode}"
+                (results if ok else errors)[name] = payload
+            elif timeout is not None and time.monotonic() - started > timeout:
+                process.terminate()
+                errors[name] = f"timed out after {timeout}s"
+            else:
+                continue
+            conn.close()
+            process.join()
+            del running[name]
+    return results, errors
+
+def _file_digest(file_path: Path) -> str:
+    """Returns the SHA-256 of a file, read in 1 MiB chunks."""
+    import hashlib
+
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _read_json(file_path: Path):
+    import json
+
+    try:
+        with open(file_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_json_atomic(file_path: Path, data):
+    import json
+
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = file_path.with_name(file_path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, file_path)
+
+def _input_fingerprint(spec: ParserSpec, previous: dict) -> tuple:
+    """Describes the parser inputs as (cache key, per-file stats).
+
+    Files whose size and mtime match the previous cache entry reuse its stored
+    digest instead of being re-hashed.
+    """
+    import hashlib
+    import json
+
+    previous_inputs = (previous or {}).get("inputs", {})
+    inputs = {}
+    for file_path in spec.input_files:
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
+            inputs[str(file_path)] = {"digest": "missing"}
+            continue
+        entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        old = previous_inputs.get(str(file_path), {})
+        if old.get("size") == entry["size"] and old.get("mtime_ns") == entry["mtime_ns"]:
+            entry["digest"] = old["digest"]
+        else:
+            entry["digest"] = _file_digest(file_path)
+        inputs[str(file_path)] = entry
+    key_source = json.dumps([spec.version, sorted((path, e["digest"]) for path, e in inputs.items())])
+    return hashlib.sha256(key_source.encode()).hexdigest(), inputs
+
+def build_dashboard_data(jobs: int = 1, timeout: float = None, use_cache: bool = True) -> dict:
+    """Runs every registered parser and merges the results into the dashboard data dict.
+
+    Parsers without any existing input file are neither run nor imported; they
+    contribute their default. With `use_cache`, parsers whose inputs and version
+    are unchanged since the last run are skipped and their cached result is reused.
+    """
+    import datetime
+
+    results, to_run, fresh_entries = {}, [], {}
+    for name, spec in PARSER_REGISTRY.items():
+        if not any(file_path.exists() for file_path in spec.input_files):
+            print(f"Warning: No input for parser '{name}', using defaults: "
+                  f"{', '.join(str(file_path) for file_path in spec.input_files)}")
+            continue
+        if not use_cache:
+            to_run.append(name)
+            continue
+        cache_file = CACHE_DIR / f"{name}.json"
+        cached = _read_json(cache_file)
+        key, inputs = _input_fingerprint(spec, cached)
+        if cached and cached.get("key") == key:
+            results[name] = cached["result"]
+        else:
+            to_run.append(name)
+            fresh_entries[name] = {"key": key, "inputs": inputs}
+    if use_cache:
+        print(f"Parser cache: {len(results)} hit(s), {len(to_run)} to parse")
+
+    # Digests already computed for the cache key are handed to parsers that need them
+    parser_kwargs = {
+        name: {spec.digest_arg: entry["inputs"][str(spec.input_files[0])]["digest"]}
+        for name, entry in fresh_entries.items()
+        if (spec := PARSER_REGISTRY[name]).digest_arg
+        and entry["inputs"][str(spec.input_files[0])]["digest"] != "missing"
+    }
+    parsed, errors = run_parsers(to_run, jobs=jobs, timeout=timeout, parser_kwargs=parser_kwargs)
+    for name, result in parsed.items():
+        results[name] = result
+        if name in fresh_entries:
+            # 失敗したパーサーの結果はキャッシュしない
+            _write_json_atomic(CACHE_DIR / f"{name}.json", dict(fresh_entries[name], result=result))
+
+    dashboard_data = {"generation_timestamp": datetime.datetime.now().isoformat(timespec="seconds")}
+    for name, spec in PARSER_REGISTRY.items():
+        if name in errors:
+            print(f"Error in parser '{name}': {errors[name]}")
+        dashboard_data[name] = results.get(name, spec.default)
+    if errors:
+        dashboard_data["parser_errors"] = errors
+    return dashboard_data
+
+def metrics_digest(dashboard_data: dict) -> str:
+    """Hashes the merged metrics, ignoring the generation timestamp."""
+    import hashlib
+    import json
+
+    metrics = {key: value for key, value in dashboard_data.items() if key != "generation_timestamp"}
+    return hashlib.sha256(json.dumps(metrics, sort_keys=True).encode()).hexdigest()
+
+_HUNK_HEADER_PATTERN = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+def git_changed_lines(base_ref: str, repo_dir: Path = Path(".")) -> dict:
+    """Returns {path: set of added/modified line numbers in HEAD} for `git diff base_ref...HEAD`."""
+    import subprocess
+
+    output = subprocess.run(
+        ["git", "diff", "--unified=0", "--no-color", "--no-ext-diff", f"{base_ref}...HEAD"],
+        cwd=repo_dir, check=True, capture_output=True, text=True,
+    ).stdout
+    changed = {}
+    current = None
+    for line in output.splitlines():
+        if line.startswith("+++ "):
+            path = line[4:]
+            current = changed.setdefault(path[2:], set()) if path.startswith("b/") else None
+        elif line.startswith("@@") and current is not None:
+            match = _HUNK_HEADER_PATTERN.match(line)
+            if match:
+                start, count = int(match.group(1)), int(match.group(2) or "1")
+                current.update(range(start, start + count))
+    return changed
+
+def collect_line_hits(file_path: Path, filenames: set) -> tuple:
+    """Streams coverage.xml and keeps per-line hits only for `filenames`.
+
+    Returns ({filename: {line: hits}}, root totals). The report's overall
+    totals come from the <coverage> root attributes, so nothing outside the
+    selected files is counted.
+    """
+    import xml.etree.ElementTree as ET
+
+    hits_by_file = {}
+    root_totals = None
+    stack = []
+    current = None
+    in_method = False
+    for event, elem in ET.iterparse(str(file_path), events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            stack.append(elem)
+            if tag == "coverage":
+                root_totals = _coverage_totals(int(elem.get("lines-valid", "0")), int(elem.get("lines-covered", "0")))
+            elif tag == "class":
+                filename = elem.get("filename", "")
+                current = hits_by_file.setdefault(filename, {}) if filename in filenames else None
+            elif tag == "method":
+                in_method = True
+            continue
+        stack.pop()
+        if tag == "line":
+            if current is not None and not in_method:
+                line = int(elem.get("number", "0"))
+                current[line] = current.get(line, 0) + int(elem.get("hits", "0"))
+        elif tag == "method":
+            in_method = False
+        elif tag == "class":
+            current = None
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+    return hits_by_file, root_totals
+
+def lookup_line_hits(line_index: Path, coverage_xml: Path, filenames: set):
+    """Reads per-line hits for `filenames` from the index written by parse_coverage_xml.
+
+    Only the rows of the requested files are read. Returns the same
+    ({filename: {line: hits}}, totals) shape as collect_line_hits, or None when
+    the index is missing or was built from a different coverage.xml.
+    """
+    import array
+    import json
+    import sqlite3
+
+    if not line_index.exists() or not coverage_xml.exists():
+        return None
+    conn = sqlite3.connect(f"file:{line_index}?mode=ro", uri=True)
+    try:
+        meta = dict(conn.execute("SELECT key, value FROM meta"))
+        source = json.loads(meta["source"])
+        stat = coverage_xml.stat()
+        # Same size and mtime: same file; otherwise fall back to comparing digests
+        if stat.st_size != source["size"]:
+            return None
+        if stat.st_mtime_ns != source["mtime_ns"] and _file_digest(coverage_xml) != source["digest"]:
+            return None
+        hits_by_file = {}
+        names = sorted(filenames)
+        for i in range(0, len(names), 900):  # SQLite's default limit on bound parameters is 999
+            chunk = names[i:i + 900]
+            for filename, blob in conn.execute(
+                f"SELECT filename, data FROM lines WHERE filename IN ({','.join('?' * len(chunk))})", chunk,
+            ):
+                values = array.array("I")
+                values.frombytes(blob)
+                hits = hits_by_file.setdefault(filename, {})
+                for line, count in zip(values[::2], values[1::2]):
+                    hits[line] = hits.get(line, 0) + count
+        return hits_by_file, _coverage_totals(int(meta["lines_total"]), int(meta["lines_covered"]))
+    except (sqlite3.Error, KeyError, ValueError):
+        return None
+    finally:
+        conn.close()
+
+def compute_coverage_diff(base_ref: str, coverage_xml: Path, baseline_json: Path, path_prefix: str = "",
+                          line_index: Path = COVERAGE_LINE_INDEX_FILE) -> dict:
+    """Computes per-file and changed-lines coverage deltas for the files touched since `base_ref`.
+
+    `path_prefix` maps coverage.xml filenames (relative to the coverage
+    source root, e.g. `pkg/mod.py`) onto repository paths (e.g. `src/pkg/mod.py`).
+    Line hits come from the index written by the dashboard's coverage parse, so
+    only the changed files are read; coverage.xml is rescanned only if that index
+    is missing or stale.
+    """
+    changed = {path: lines for path, lines in git_changed_lines(base_ref).items() if path.endswith(".py")}
+    # Index changed files by their coverage.xml name; only these are looked up anywhere below
+    by_coverage_name = {path[len(path_prefix):]: path for path in changed if path.startswith(path_prefix)}
+    indexed = lookup_line_hits(line_index, coverage_xml, set(by_coverage_name))
+    if indexed is None:
+        print(f"Warning: Coverage line index missing or stale ({line_index}); scanning {coverage_xml}")
+        indexed = collect_line_hits(coverage_xml, set(by_coverage_name))
+    hits_by_file, head_totals = indexed
+    baseline = (_read_json(baseline_json) or {}).get("coverage", {})
+    baseline_files = baseline.get("files", {})
+
+    files = []
+    changed_total = changed_covered = 0
+    for coverage_name, repo_path in sorted(by_coverage_name.items()):
+        hits = hits_by_file.get(coverage_name, {})
+        head = _coverage_totals(len(hits), sum(1 for count in hits.values() if count > 0))
+        base = baseline_files.get(coverage_name)
+        # Only executable lines (those present in coverage.xml) count towards changed-lines coverage
+        executable = [line for line in changed[repo_path] if line in hits]
+        covered = sum(1 for line in executable if hits[line] > 0)
+        changed_total += len(executable)
+        changed_covered += covered
+        files.append({
+            "file": repo_path,
+            "base_coverage": base["coverage_percentage"] if base else None,
+            "head_coverage": head["coverage_percentage"] if hits else None,
+            "delta": round(head["coverage_percentage"] - base["coverage_percentage"], 2) if base and hits else None,
+            "changed_lines": len(executable),
+            "changed_lines_covered": covered,
+            "uncovered_changed_lines": sorted(line for line in executable if hits[line] == 0),
+        })
+
+    head_total = (head_totals or {}).get("coverage_percentage")
+    base_total = baseline.get("coverage_percentage")
+    return {
+        "base_ref": base_ref,
+        "base_coverage": base_total,
+        "head_coverage": head_total,
+        "delta": round(head_total - base_total, 2) if head_total is not None and base_total is not None else None,
+        "changed_lines": changed_total,
+        "changed_lines_covered": changed_covered,
+        "changed_lines_coverage": round(changed_covered / changed_total * 100.0, 2) if changed_total else None,
+        "files": files,
+    }
+
+def parse_args(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate quality dashboard data and HTML report.")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                        help="number of parsers to run concurrently (1 = sequential, in-process)")
+    parser.add_argument("--timeout", type=float, default=300.0,
+                        help="per-parser timeout in seconds when --jobs > 1")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="reparse every report and re-render even if nothing changed")
+    parser.add_argument("--commit", default=os.environ.get("GITHUB_SHA", "unknown"),
+                        help="commit recorded in the metrics history")
+    parser.add_argument("--branch", default=os.environ.get("GITHUB_HEAD_REF") or os.environ.get("GITHUB_REF_NAME", "local"),
+                        help="branch recorded in the metrics history")
+    parser.add_argument("--no-history", action="store_true",
+                        help="do not append this run to the metrics history")
+    parser.add_argument("--benchmark-lint", type=int, metavar="N",
+                        help="benchmark flake8 aggregation on N synthetic findings and exit")
+    parser.add_argument("--diff-base", metavar="REF",
+                        help="PR mode: only compute the coverage delta of files changed since REF and exit")
+    parser.add_argument("--baseline", type=Path, default=OUTPUT_JSON_FILE,
+                        help="dashboard_data.json from the base branch, used by --diff-base")
+    parser.add_argument("--coverage-path-prefix", default="",
+                        help="prefix that turns coverage.xml filenames into repository paths (e.g. 'src/')")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="report per-module import times and the time to first useful work")
+    return parser.parse_args(argv)
+
+def print_startup_profile(top_n: int = LINT_TOP_N):
+    """Prints the imports timed by --profile-startup, split into startup and lazy (per-report) imports.
+
+    Times are measured from the first line of this script; interpreter startup
+    itself is not included (use `python -X importtime` for that part).
+    """
+    first_work = _first_work_at if _first_work_at is not None else time.perf_counter() - _SCRIPT_STARTED
+    # Depth 0 only: nested imports are already included in their importer's time
+    imports = sorted((entry for entry in _IMPORT_TIMES if entry[1] == 0), reverse=True)
+    startup = [entry for entry in imports if entry[3] < first_work]
+    print(f"Startup profile: first useful work after {first_work * 1000:.1f} ms "
+          f"(target < {STARTUP_TARGET_SECONDS * 1000:.0f} ms; interpreter startup not included)")
+    print(f"  startup imports: {sum(entry[0] for entry in startup) * 1000:.1f} ms, "
+          f"lazy imports: {sum(entry[0] for entry in imports if entry not in startup) * 1000:.1f} ms")
+    print(f"  {'ms':>8}  {'phase':<8}module")
+    for seconds, _, name, offset in imports[:top_n]:
+        print(f"  {seconds * 1000:>8.2f}  {'startup' if offset < first_work else 'lazy':<8}{name}")
+    if first_work > STARTUP_TARGET_SECONDS:
+        print(f"Warning: Startup took {first_work * 1000:.1f} ms, above the {STARTUP_TARGET_SECONDS * 1000:.0f} ms target")
+
+def main(argv=None):
+    global _first_work_at
+    args = parse_args(argv)
+    _first_work_at = time.perf_counter() - _SCRIPT_STARTED
+    try:
+        generate(args)
+    finally:
+        if args.profile_startup:
+            print_startup_profile()
+
+def _import_history_store():
+    """Imports the history store under its guide name or this example's name; None if neither exists."""
+    try:
+        import dashboard_history as history_store  # scripts/dashboard_history.py
+    except ImportError:
+        try:
+            import reference_quality_dashboard_history_store as history_store
+        except ImportError:
+            return None
+    return history_store
+
+def generate(args):
+    """Runs the mode selected by the parsed command line arguments."""
+    import json
+
+    if args.benchmark_lint:
+        print(json.dumps(benchmark_flake8_parsing(args.benchmark_lint), indent=2))
+        return
+    if args.diff_base:
+        # PRモード: 変更ファイルのみを対象に、ベースラインとのカバレッジ差分をPRコメント用JSONで出力
+        diff = compute_coverage_diff(args.diff_base, COVERAGE_XML_FILE, args.baseline, args.coverage_path_prefix)
+        COVERAGE_DIFF_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(COVERAGE_DIFF_FILE, "w") as f:
+            json.dump(diff, f, separators=(",", ":"))
+        print(f"Coverage diff generated: {COVERAGE_DIFF_FILE} (changed-lines coverage: {diff['changed_lines_coverage']})")
+        return
+    # 登録済みパーサーを並列実行し、結果をdashboard_dataにマージ
+    use_cache = not args.no_cache
+    dashboard_data = build_dashboard_data(jobs=args.jobs, timeout=args.timeout, use_cache=use_cache)
+
+    if dashboard_data.get("parser_errors") and not args.no_history:
+        # 既定値で埋めた指標をトレンドに残さない
+        print(f"Warning: Not appending to the metrics history, parser(s) failed: {', '.join(dashboard_data['parser_errors'])}")
+    elif not args.no_history:
+        # 実行ごとに履歴へ追記し、トレンド表示用の時系列をエクスポート
+        history_store = _import_history_store()
+        if history_store is None:
+            print("Warning: Metrics history module not found (scripts/dashboard_history.py); skipping history.")
+        else:
+            history = history_store.open_history(HISTORY_DB_FILE)
+            try:
+                history_store.append_run(history, dashboard_data, args.commit, args.branch, int(time.time()))
+                history_store.export_series(history, HISTORY_EXPORT_DIR, TREND_METRICS, args.branch)
+            finally:
+                history.close()
+
+    # 指標が前回から変化していなければ、JSON/HTMLの再生成をスキップ
+    digest = metrics_digest(dashboard_data)
+    render_state = _read_json(RENDER_STATE_FILE) if use_cache else None
+    if (render_state and render_state.get("metrics_digest") == digest
+            and OUTPUT_JSON_FILE.exists() and OUTPUT_HTML_FILE.exists()):
+        print("Metrics unchanged since last run; skipping dashboard re-render.")
+        return
+
     # ダッシュボード用データを出力
-    dashboard_data = {"coverage": coverage, "pylint": pylint}
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     with open(OUTPUT_JSON_FILE, "w") as f:
         json.dump(dashboard_data, f, indent=2)
     print(f"Dashboard data JSON generated: {OUTPUT_JSON_FILE}")
         
     generate_html_report(dashboard_data, OUTPUT_HTML_FILE)
+    _write_json_atomic(RENDER_STATE_FILE, {"metrics_digest": digest})
 
 if __name__ == "__main__":
     main()
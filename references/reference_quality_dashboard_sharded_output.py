@@ -0,0 +1,310 @@
+# Python Example: Sharded Static Org Dashboard with Precomputed Rollups
+# 複数リポジトリの品質データを リポジトリ/モジュール 単位のシャードに分割し、GitHub Pagesで配信する例
+# Source: quality_dashboard_guide.md (ダッシュボードの公開), project_management_guide.md (section 3.3 CI/CDパイプラインとの統合)
+# Filename in guide: scripts/shard_dashboard.py
+#
+# 各リポジトリの generate_dashboard.py が出力した dashboard_data.json を入力とし、
+#   org -> repo -> ディレクトリ（モジュール） の各階層ごとに集計済みのJSONシャードを書き出す。
+# シャード名は内容のハッシュを含む（<path>.<hash>.json）ため、変更のない階層は同じファイル名のまま
+# 再生成・再圧縮されず、gh-pagesへの公開差分は変更された階層だけになる。各シャードには
+# .gz（と brotli がインストールされていれば .br）の事前圧縮版も置く。
+# manifest.json（org・リポジトリ -> シャード名）だけを短いキャッシュで配信する。manifestの大きさは
+# リポジトリ数にのみ比例し、ディレクトリ階層へは各シャードに含まれる子シャード名をたどって移動する。
+#
+#   python scripts/shard_dashboard.py --repo api=repos/api/dashboard_data.json \
+#       --repo web=repos/web/dashboard_data.json --output-dir dashboard_output/org --prune
+
+import argparse
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+try:
+    import brotli  # Optional: pip install brotli
+except ImportError:
+    brotli = None
+
+OUTPUT_DIR = Path("./dashboard_output/org")
+SHARD_DIR_NAME = "shards"
+MANIFEST_FILE_NAME = "manifest.json"
+# Repo-level metrics summed into the org rollup (dotted paths into dashboard_data.json)
+ROLLUP_METRICS = [
+    "pylint.total_issues",
+    "flake8.total_issues",
+    "security.total_unique",
+    "security.by_severity.critical",
+    "security.by_severity.high",
+    "test_durations.total_seconds",
+]
+_UNSAFE_NAME_PATTERN = re.compile(r"[^A-Za-z0-9_.-]+")
+
+class ModuleNode:
+    """One directory level: files directly inside it, child directories and the rolled-up line counts."""
+
+    __slots__ = ("children", "files", "lines_total", "lines_covered", "file_count")
+
+    def __init__(self):
+        self.children = {}
+        self.files = []  # [name, lines_total, lines_covered, coverage_percentage]
+        self.lines_total = 0
+        self.lines_covered = 0
+        self.file_count = 0
+
+def build_module_tree(files: dict) -> ModuleNode:
+    """Builds the directory tree of {filename: coverage totals} and rolls the totals up to every level."""
+    root = ModuleNode()
+    for filename, totals in files.items():
+        *directories, name = filename.replace("\\", "/").split("/")
+        node = root
+        path = [node]
+        for directory in directories:
+            node = node.children.setdefault(directory, ModuleNode())
+            path.append(node)
+        node.files.append([name, totals["lines_total"], totals["lines_covered"], totals["coverage_percentage"]])
+        for ancestor in path:
+            ancestor.lines_total += totals["lines_total"]
+            ancestor.lines_covered += totals["lines_covered"]
+            ancestor.file_count += 1
+    return root
+
+def _coverage_aggregate(lines_total: int, lines_covered: int, file_count: int) -> dict:
+    return {
+        "lines_total": lines_total,
+        "lines_covered": lines_covered,
+        "coverage_percentage": round(lines_covered / lines_total * 100.0, 2) if lines_total else 0.0,
+        "files": file_count,
+    }
+
+def _metric(data: dict, dotted: str):
+    for key in dotted.split("."):
+        if not isinstance(data, dict) or key not in data:
+            return None
+        data = data[key]
+    return data if isinstance(data, (int, float)) and not isinstance(data, bool) else None
+
+class ShardWriter:
+    """Writes content-addressed shards (plus .gz/.br) and remembers which ones the manifest references."""
+
+    def __init__(self, output_dir: Path):
+        self.shard_dir = output_dir / SHARD_DIR_NAME
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        self.referenced = set()
+        self.written = 0
+        self.reused = 0
+
+    def write(self, view_path: str, payload: dict) -> str:
+        data = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode()
+        digest = hashlib.sha256(data).hexdigest()[:16]
+        slug = _UNSAFE_NAME_PATTERN.sub("_", view_path.replace("/", "__")) or "org"
+        name = f"{slug}.{digest}.json"
+        target = self.shard_dir / name
+        self.referenced.update({name, f"{name}.gz", f"{name}.br"})
+        if target.exists():
+            # 同じ内容のシャードは既に公開済み: 書き込み・圧縮を省略
+            self.reused += 1
+            return name
+        # Compressed copies first, so a shard never exists without them
+        _write_atomic(self.shard_dir / f"{name}.gz", gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            _write_atomic(self.shard_dir / f"{name}.br", brotli.compress(data, quality=11))
+        _write_atomic(target, data)
+        self.written += 1
+        return name
+
+    def prune(self) -> int:
+        """Deletes shards no longer referenced by the manifest; returns the number removed."""
+        removed = 0
+        for file_path in self.shard_dir.iterdir():
+            if file_path.name not in self.referenced:
+                file_path.unlink()
+                removed += 1
+        return removed
+
+def _write_atomic(file_path: Path, data: bytes):
+    tmp_path = file_path.with_name(file_path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, file_path)
+
+def _write_module_shards(writer: ShardWriter, node: ModuleNode, view_path: str, metrics: dict = None) -> dict:
+    """Writes the shards of `node` and its subtree (children first); returns the child entry for its parent.
+
+    `metrics` (repository level only) is stored in the node's aggregate next to the coverage totals.
+    """
+    children = [
+        _write_module_shards(writer, child, f"{view_path}/{name}")
+        for name, child in sorted(node.children.items())
+    ]
+    aggregate = _coverage_aggregate(node.lines_total, node.lines_covered, node.file_count)
+    if metrics is not None:
+        aggregate["metrics"] = metrics
+    shard = writer.write(view_path, {
+        "path": view_path,
+        "aggregate": aggregate,
+        "children": children,
+        # 最もカバレッジの低いファイルから表示
+        "files": sorted(node.files, key=lambda row: row[3]),
+    })
+    return {"name": view_path.rsplit("/", 1)[-1], "path": view_path, "aggregate": aggregate, "shard": shard}
+
+def write_repo_shards(writer: ShardWriter, repo: str, dashboard_data: dict) -> dict:
+    """Shards one repository's coverage by directory; returns its entry (with repo metrics) for the org level."""
+    tree = build_module_tree(dashboard_data.get("coverage", {}).get("files", {}))
+    metrics = {name: value for name in ROLLUP_METRICS if (value := _metric(dashboard_data, name)) is not None}
+    entry = _write_module_shards(writer, tree, repo, metrics)
+    entry["generation_timestamp"] = dashboard_data.get("generation_timestamp")
+    return entry
+
+def build_sharded_output(repo_files: dict, output_dir: Path = OUTPUT_DIR, prune: bool = False) -> dict:
+    """Shards every repository's dashboard_data.json and writes the org rollup and manifest.
+
+    Repositories are processed one at a time, so memory is bounded by the
+    largest repository rather than the whole org. The manifest only lists the
+    org and repository shards; directories are reached through the `shard`
+    of each child entry. Returns the manifest.
+    """
+    writer = ShardWriter(output_dir)
+    repos = []
+    for repo, data_file in sorted(repo_files.items()):
+        try:
+            with open(data_file, "r") as f:
+                dashboard_data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Skipping repository '{repo}', cannot read {data_file}: {e}")
+            continue
+        repos.append(write_repo_shards(writer, repo, dashboard_data))
+
+    org_metrics = {}
+    for entry in repos:
+        for name, value in entry["aggregate"]["metrics"].items():
+            org_metrics[name] = org_metrics.get(name, 0) + value
+    org_aggregate = _coverage_aggregate(sum(e["aggregate"]["lines_total"] for e in repos),
+                                        sum(e["aggregate"]["lines_covered"] for e in repos),
+                                        sum(e["aggregate"]["files"] for e in repos))
+    org_aggregate["metrics"] = {name: round(value, 3) for name, value in org_metrics.items()}
+    root = writer.write("", {"path": "", "aggregate": org_aggregate, "children": repos, "files": []})
+
+    manifest = {
+        "generated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "shard_dir": SHARD_DIR_NAME,
+        "encodings": ["gzip", "br"] if brotli is not None else ["gzip"],
+        "root": root,
+        # Repository name -> shard; deeper views are linked from their parent shard
+        "repos": {entry["path"]: entry["shard"] for entry in repos},
+    }
+    _write_atomic(output_dir / MANIFEST_FILE_NAME, json.dumps(manifest, separators=(",", ":")).encode())
+    _write_atomic(output_dir / "index.html", VIEWER_HTML.encode())
+    removed = writer.prune() if prune else 0
+    print(f"Sharded dashboard generated: {output_dir} ({writer.written + writer.reused} views, {writer.written} shard(s) written, "
+          f"{writer.reused} unchanged, {removed} pruned)")
+    return manifest
+
+# Minimal viewer: loads the manifest, then walks from the repository shard to the view in the URL hash
+# (#repo/pkg/sub) through the child shard names. Shards are immutable, so each is fetched at most once.
+# Pre-compressed .gz shards are fetched and inflated with DecompressionStream where the browser supports it.
+VIEWER_HTML = """<!DOCTYPE html>
+<html lang="ja">
+<head>
+  <meta charset="UTF-8">
+  <title>Organization Quality Dashboard</title>
+  <style>
+    body { font-family: sans-serif; margin: 20px; }
+    table { border-collapse: collapse; }
+    th, td { border: 1px solid #ddd; padding: 4px 8px; text-align: left; }
+  </style>
+</head>
+<body>
+  <h1 id="title">Organization Quality Dashboard</h1>
+  <p id="summary"></p>
+  <table id="metrics"></table>
+  <table><thead><tr><th>Name</th><th>Files</th><th>Lines</th><th>Coverage %</th><th>Metrics</th></tr></thead><tbody id="rows"></tbody></table>
+  <script>
+    const manifestPromise = fetch("manifest.json", {cache: "no-cache"}).then(r => r.json());
+    const shardCache = new Map();
+    function loadShard(manifest, name) {
+      if (!shardCache.has(name)) shardCache.set(name, fetchShard(manifest, name));
+      return shardCache.get(name);
+    }
+    async function fetchShard(manifest, name) {
+      const base = manifest.shard_dir + "/" + name;
+      if ("DecompressionStream" in window) {
+        const response = await fetch(base + ".gz");
+        if (response.ok) {
+          return new Response(response.body.pipeThrough(new DecompressionStream("gzip"))).json();
+        }
+      }
+      return (await fetch(base)).json();
+    }
+    async function resolveView(manifest, path) {
+      if (!path) return loadShard(manifest, manifest.root);
+      const [repo, ...parts] = path.split("/");
+      if (!(repo in manifest.repos)) return null;
+      let view = await loadShard(manifest, manifest.repos[repo]);
+      for (const part of parts) {
+        const child = view.children.find(c => c.path === view.path + "/" + part);
+        if (!child) return null;
+        view = await loadShard(manifest, child.shard);
+      }
+      return view;
+    }
+    function metricsText(aggregate) {
+      return Object.entries(aggregate.metrics || {}).map(([name, value]) => `${name}: ${value}`).join(", ");
+    }
+    function row(cells) {
+      const tr = document.createElement("tr");
+      cells.forEach(cell => { const td = document.createElement("td"); td.append(cell); tr.appendChild(td); });
+      return tr;
+    }
+    async function render() {
+      const manifest = await manifestPromise;
+      const path = decodeURIComponent(location.hash.slice(1));
+      const view = await resolveView(manifest, path);
+      const rows = document.getElementById("rows");
+      const metrics = document.getElementById("metrics");
+      rows.replaceChildren();
+      metrics.replaceChildren();
+      if (!view) { document.getElementById("summary").textContent = "Unknown view: " + path; return; }
+      const a = view.aggregate;
+      document.getElementById("title").textContent = view.path || "Organization Quality Dashboard";
+      document.getElementById("summary").textContent =
+        `Coverage ${a.coverage_percentage}% (${a.lines_covered}/${a.lines_total} lines, ${a.files} files)`;
+      // 集計済みの非カバレッジ指標（org: 全リポジトリ合計、repo: そのリポジトリの値）
+      Object.entries(a.metrics || {}).forEach(([name, value]) => metrics.appendChild(row([name, value])));
+      view.children.forEach(child => {
+        const link = document.createElement("a");
+        link.href = "#" + child.path;
+        link.textContent = child.name + "/";
+        rows.appendChild(row([link, child.aggregate.files, child.aggregate.lines_total,
+                              child.aggregate.coverage_percentage, metricsText(child.aggregate)]));
+      });
+      view.files.forEach(([name, total, covered, pct]) => rows.appendChild(row([name, 1, total, pct, ""])));
+    }
+    window.addEventListener("hashchange", render);
+    render();
+  </script>
+</body>
+</html>
+"""
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shard per-repository dashboard data into a static org dashboard.")
+    parser.add_argument("--repo", action="append", default=[], metavar="NAME=PATH",
+                        help="repository name and its dashboard_data.json (repeatable)")
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR)
+    parser.add_argument("--prune", action="store_true", help="delete shards that the new manifest no longer references")
+    args = parser.parse_args(argv)
+
+    repo_files = {}
+    for spec in args.repo:
+        name, sep, path = spec.partition("=")
+        if not sep or not name or "/" in name:
+            parser.error(f"--repo expects NAME=PATH with a name without '/': {spec}")
+        repo_files[name] = Path(path)
+    build_sharded_output(repo_files, args.output_dir, args.prune)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+# Python Example: Benchmark Suite and Regression Gate for the Quality Pipeline
+# 品質パイプライン自体（レポートパーサー・HTML生成・フィクスチャ）の速度とメモリを計測し、劣化をCIで検出する例
+# Source: quality_dashboard_guide.md (CI/CDパイプラインとの統合, トレンド表示)
+# Filename in guide: scripts/benchmark_pipeline.py
+#
+# 合成レポート（coverage.xml / pylint JSON / flake8テキスト / Trivy JSON）を 1x/10x/100x の規模で生成し、
+# 各ステージの実行時間とピークメモリを計測して dashboard_history.sqlite に "benchmark.*" 指標として保存する。
+# 同じブランチの直近N回の中央値より threshold 以上遅い（または多くメモリを使う）ステージがあれば終了コード1。
+#
+#   python scripts/benchmark_pipeline.py --scales 1 10 100 --threshold 0.25
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Guide file names first (scripts/*.py), then the names of these examples
+try:
+    import dashboard_history as history_store  # scripts/dashboard_history.py
+except ImportError:
+    import reference_quality_dashboard_history_store as history_store
+try:
+    import generate_dashboard as dashboard  # scripts/generate_dashboard.py
+except ImportError:
+    import reference_quality_dashboard_script_example as dashboard
+
+# Size of the 1x reports; 10x/100x multiply every count
+BASE_SOURCE_FILES = 100
+LINES_PER_FILE = 100
+BASE_LINT_FINDINGS = 2_000
+BASE_VULNERABILITIES = 300
+BASE_FIXTURE_LEASES = 500
+
+DEFAULT_SCALES = [1, 10]
+DEFAULT_THRESHOLD = 0.25  # Fail when a stage is more than 25% slower/larger than its baseline
+DEFAULT_WINDOW = 5  # Baseline: median of the last N recorded runs of the same branch
+# Stages faster than this are too noisy on shared CI runners to gate on
+MIN_GATED_SECONDS = 0.005
+
+_PYLINT_TYPES = (("convention", "C0114", "missing-module-docstring"), ("warning", "W0612", "unused-variable"),
+                 ("refactor", "R0913", "too-many-arguments"), ("error", "E1101", "no-member"))
+_FLAKE8_CODES = ("E501", "W291", "F401", "E302", "C901", "W605")
+_SEVERITIES = ("CRITICAL", "HIGH", "MEDIUM", "LOW", "UNKNOWN")
+
+# --- synthetic report generators --- #
+
+def write_coverage_xml(file_path: Path, scale: int):
+    """Cobertura report with BASE_SOURCE_FILES * scale files of LINES_PER_FILE lines (2/3 covered)."""
+    num_files = BASE_SOURCE_FILES * scale
+    total = num_files * LINES_PER_FILE
+    covered = sum(1 for line in range(1, LINES_PER_FILE + 1) if line % 3) * num_files
+    with open(file_path, "w", buffering=1 << 20) as f:
+        f.write(f'<?xml version="1.0" ?>\n<coverage version="7.4" lines-valid="{total}" lines-covered="{covered}" '
+                f'line-rate="{covered / total:.4f}">\n<packages>\n')
+        for package in range(max(1, num_files // 20)):
+            f.write(f'<package name="pkg{package}"><classes>\n')
+            for module in range(package * 20, min(num_files, package * 20 + 20)):
+                f.write(f'<class name="module_{module}.py" filename="pkg{package}/module_{module}.py">'
+                        '<methods/><lines>\n')
+                f.write("".join(f'<line number="{line}" hits="{1 if line % 3 else 0}"/>\n'
+                                for line in range(1, LINES_PER_FILE + 1)))
+                f.write("</lines></class>\n")
+            f.write("</classes></package>\n")
+        f.write("</packages>\n</coverage>\n")
+
+def write_pylint_json(file_path: Path, scale: int):
+    """Classic pylint `json` format: a top-level array of messages."""
+    num_files = BASE_SOURCE_FILES * scale
+    with open(file_path, "w", buffering=1 << 20) as f:
+        f.write("[")
+        for i in range(BASE_LINT_FINDINGS * scale):
+            kind, message_id, symbol = _PYLINT_TYPES[i % len(_PYLINT_TYPES)]
+            f.write(("," if i else "") + json.dumps({
+                "type": kind, "module": f"pkg.module_{i % num_files}", "path": f"src/pkg/module_{i % num_files}.py",
+                "line": i % 400 + 1, "column": 0, "symbol": symbol, "message-id": message_id,
+                "message": f"synthetic finding {i}",
+            }))
+        f.write("]")
+
+def write_flake8_txt(file_path: Path, scale: int):
+    num_files = BASE_SOURCE_FILES * scale
+    with open(file_path, "w", buffering=1 << 20) as f:
+        for i in range(BASE_LINT_FINDINGS * scale):
+            f.write(f"src/pkg/module_{i % num_files}.py:{i % 400 + 1}:{i % 80 + 1}: "
+                    f"{_FLAKE8_CODES[i % len(_FLAKE8_CODES)]} synthetic finding {i}\n")
+
+def write_trivy_json(file_path: Path, scale: int):
+    """Trivy report over several image targets sharing CVEs, so deduplication has work to do."""
+    vulnerabilities = [
+        {"VulnerabilityID": f"CVE-2024-{i:05d}", "PkgName": f"package{i % 97}", "InstalledVersion": f"1.{i % 13}.0",
+         "Severity": _SEVERITIES[i % len(_SEVERITIES)], "Title": f"synthetic vulnerability {i}"}
+        for i in range(BASE_VULNERABILITIES * scale)
+    ]
+    targets = 4
+    per_target = len(vulnerabilities) // 2  # Each CVE appears in two targets
+    report = {"Results": [
+        {"Target": f"app-image-{t}", "Vulnerabilities": (vulnerabilities * 2)[t * per_target:(t + 1) * per_target]}
+        for t in range(targets)
+    ]}
+    with open(file_path, "w") as f:
+        json.dump(report, f)
+
+# --- stages --- #
+
+def _security_args(trivy_file: Path) -> list:
+    # parse_security_reports takes one path per SECURITY_REPORT_FILES entry; the others do not exist
+    missing = trivy_file.with_name("missing-report.json")
+    return [trivy_file if tool == "trivy" else missing for tool in dashboard.SECURITY_REPORT_FILES]
+
+def _fixture_pool_leases(db_file: Path, leases: int):
+    """Lease/rollback cycles through the per-worker ResourcePool (reference_pytest_fixture_pool_example.py)."""
+    from reference_pytest_fixture_pool_example import FixtureTimings, ResourcePool
+
+    def connect():
+        return sqlite3.connect(str(db_file), isolation_level=None, check_same_thread=False)
+
+    with contextlib.closing(connect()) as conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, username TEXT NOT NULL)")
+    pool = ResourcePool("db_connection", factory=connect, begin=lambda conn: conn.execute("BEGIN"),
+                        reset=lambda conn: conn.execute("ROLLBACK") if conn.in_transaction else None,
+                        close=lambda conn: conn.close(), timings=FixtureTimings())
+    try:
+        for i in range(leases):
+            with pool.lease() as conn:
+                conn.execute("INSERT INTO users (username) VALUES (?)", (f"user{i}",))
+    finally:
+        pool.close_all()
+
+def build_stages(work_dir: Path, scale: int) -> dict:
+    """Generates the synthetic inputs for one scale and returns {stage name: zero-argument callable}."""
+    reports = {
+        "coverage": (work_dir / "coverage.xml", write_coverage_xml),
+        "pylint": (work_dir / "pylint-report.json", write_pylint_json),
+        "flake8": (work_dir / "flake8-report.txt", write_flake8_txt),
+        "trivy": (work_dir / "trivy-report.json", write_trivy_json),
+    }
+    for file_path, writer in reports.values():
+        writer(file_path, scale)
+    # The HTML stage renders what the parsers produce, so its input grows with the scale too
+    html_input = {
+        "generation_timestamp": "benchmark",
+        "coverage": dashboard.parse_coverage_xml(reports["coverage"][0], work_dir / "coverage_lines.sqlite"),
+        "pylint": dashboard.parse_pylint_json(reports["pylint"][0]),
+        "flake8": dashboard.parse_flake8_txt(reports["flake8"][0]),
+        "security": dashboard.parse_security_reports(*_security_args(reports["trivy"][0])),
+    }
+    return {
+        "parse_coverage": lambda: dashboard.parse_coverage_xml(reports["coverage"][0], work_dir / "coverage_lines.sqlite"),
+        "parse_pylint": lambda: dashboard.parse_pylint_json(reports["pylint"][0]),
+        "parse_flake8": lambda: dashboard.parse_flake8_txt(reports["flake8"][0]),
+        "parse_security": lambda: dashboard.parse_security_reports(*_security_args(reports["trivy"][0])),
+        "generate_html": lambda: dashboard.generate_html_report(html_input, work_dir / "html" / "quality_dashboard.html"),
+        "fixture_pool": lambda: _fixture_pool_leases(work_dir / "fixture_pool.sqlite3", BASE_FIXTURE_LEASES * scale),
+    }
+
+def measure(func, repeat: int = 3) -> dict:
+    """Best-of-`repeat` wall time, then peak traced memory in a separate pass (tracemalloc slows the code down)."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": round(min(timings), 4), "peak_mib": round(peak / 2**20, 2)}
+
+def run_benchmarks(scales: list, stages: list = None, repeat: int = 3, work_dir: Path = None) -> dict:
+    """Returns {"benchmark": {stage: {"<scale>x": {"seconds": s, "peak_mib": m}}}}, the shape stored in the history."""
+    results = {}
+    for scale in scales:
+        with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+            # Parsers and the HTML generator report progress with print(); keep the benchmark output readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                available = build_stages(Path(tmp), scale)
+                for name in stages or available:
+                    results.setdefault(name, {})[f"{scale}x"] = measure(available[name], repeat)
+    return {"benchmark": results}
+
+# --- regression gate --- #
+
+def find_regressions(conn: sqlite3.Connection, results: dict, branch: str, threshold: float = DEFAULT_THRESHOLD,
+                     window: int = DEFAULT_WINDOW, min_seconds: float = MIN_GATED_SECONDS) -> list:
+    """Compares every metric against the median of its last `window` recorded values on `branch`.
+
+    Must run before the current results are appended. Metrics without
+    history are skipped (the first run only establishes the baseline).
+    """
+    regressions = []
+    for name, value in history_store.flatten_metrics(results):
+        previous = [v for _, v in history_store.query_range(conn, name, branch)][-window:]
+        if not previous:
+            continue
+        baseline = statistics.median(previous)
+        if name.endswith(".seconds") and max(baseline, value) < min_seconds:
+            continue
+        if baseline > 0 and value > baseline * (1 + threshold):
+            regressions.append({"metric": name, "baseline": baseline, "value": value,
+                                "change_pct": round((value / baseline - 1) * 100.0, 1)})
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the quality pipeline and gate on regressions.")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="report sizes, e.g. 1 10 100")
+    parser.add_argument("--stages", nargs="*", help="subset of stages to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage; the fastest is kept")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown/growth over the baseline (0.25 = 25%%)")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="number of previous runs in the baseline")
+    parser.add_argument("--db", type=Path, default=history_store.HISTORY_DB_FILE)
+    parser.add_argument("--commit", default=os.environ.get("GITHUB_SHA", "unknown"))
+    parser.add_argument("--branch", default=os.environ.get("GITHUB_HEAD_REF") or os.environ.get("GITHUB_REF_NAME", "local"))
+    parser.add_argument("--baseline-branch", help="branch whose history is the baseline (default: --branch)")
+    parser.add_argument("--no-record", action="store_true", help="gate only; do not append this run to the history")
+    parser.add_argument("--output", type=Path, help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.scales, args.stages, args.repeat)
+    print(f"{'stage':<16}{'scale':>7}{'seconds':>10}{'peak MiB':>10}")
+    for stage, by_scale in results["benchmark"].items():
+        for scale, measured in by_scale.items():
+            print(f"{stage:<16}{scale:>7}{measured['seconds']:>10.4f}{measured['peak_mib']:>10.2f}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    conn = history_store.open_history(args.db)
+    try:
+        regressions = find_regressions(conn, results, args.baseline_branch or args.branch, args.threshold, args.window)
+        if not args.no_record:
+            history_store.append_run(conn, results, args.commit, args.branch, int(time.time()))
+    finally:
+        conn.close()
+
+    if regressions:
+        print(f"Error: {len(regressions)} benchmark regression(s) beyond {args.threshold * 100:.0f}%:")
+        for r in regressions:
+            print(f"  {r['metric']}: {r['baseline']:.4f} -> {r['value']:.4f} (+{r['change_pct']}%)")
+        raise SystemExit(1)
+    print("No benchmark regressions.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+# Python Example: Unified Security Findings Normalizer with Fingerprint Dedup Index
+# SAST/SCA/DAST/シークレット検知レポートを共通形式に正規化し、重複を除去する例
+# Source: security_tools_overview.md, quality_dashboard_guide.md (セキュリティ指標の集計)
+# Filename in guide: scripts/security_findings.py
+#
+# 対応フォーマット:
+#   bandit -r src/ -f json -o bandit-report.json            (sast_bandit_usage.md)
+#   semgrep scan --json --output semgrep-report.json         (sast_semgrep_usage.md)
+#   pip-audit -f json > pip-audit-report.json                (sca_pip_audit_usage.md)
+#   trivy image -f json -o trivy-report.json <image>         (sca_trivy_usage.md)
+#   ZAP JSONレポート / zap.core.alerts() の結果               (dast_owasp_zap_usage.md)
+#   detect-secrets scan > detect-secrets-report.json         (secrets_detect_secrets_usage.md)
+
+import argparse
+import hashlib
+import json
+import re
+from collections import Counter
+from pathlib import Path
+
+SEVERITIES = ("critical", "high", "medium", "low", "info", "unknown")
+SEVERITY_RANK = {name: rank for rank, name in enumerate(reversed(SEVERITIES))}
+
+# Tool-specific severity labels mapped onto SEVERITIES
+_SEVERITY_ALIASES = {
+    "critical": "critical",
+    "high": "high", "error": "high",
+    "medium": "medium", "moderate": "medium", "warning": "medium",
+    "low": "low",
+    "info": "info", "informational": "info", "note": "info",
+}
+_ZAP_RISK_CODES = {"3": "high", "2": "medium", "1": "low", "0": "info"}
+_CWE_PATTERN = re.compile(r"CWE-(\d+)", re.IGNORECASE)
+
+def normalize_severity(label) -> str:
+    return _SEVERITY_ALIASES.get(str(label or "").strip().lower(), "unknown")
+
+def _normalize_path(path: str) -> str:
+    path = (path or "").replace("\\", "/")
+    return path[2:] if path.startswith("./") else path
+
+def _fingerprint(*parts) -> bytes:
+    """16-byte digest identifying one issue independently of the reporting tool."""
+    return hashlib.blake2b("\x1f".join(str(part) for part in parts).encode(), digest_size=16).digest()
+
+class Finding:
+    """One normalized finding; __slots__ keeps ~100k+ instances compact."""
+
+    __slots__ = ("tool", "category", "rule_id", "severity", "location", "line", "title",
+                 "fingerprint", "occurrences")
+
+    def __init__(self, tool, category, rule_id, severity, location, line, title, fingerprint):
+        self.tool = tool
+        self.category = category
+        self.rule_id = rule_id
+        self.severity = severity
+        self.location = location
+        self.line = line
+        self.title = title
+        self.fingerprint = fingerprint
+        self.occurrences = 1
+
+    def to_dict(self) -> dict:
+        return {
+            "tool": self.tool,
+            "category": self.category,
+            "rule_id": self.rule_id,
+            "severity": self.severity,
+            "location": self.location,
+            "line": self.line,
+            "title": self.title,
+            "fingerprint": self.fingerprint.hex(),
+            "occurrences": self.occurrences,
+        }
+
+def _code_finding(tool, rule_id, cwe, severity, path, line, title) -> Finding:
+    # SAST: CWEが分かればCWE単位で指紋化し、Bandit/Semgrepの同一指摘を1件にまとめる
+    path = _normalize_path(path)
+    key = f"CWE-{cwe}" if cwe else rule_id
+    return Finding(tool, "sast", rule_id, severity, path, line, title, _fingerprint("sast", path, line, key))
+
+def _dependency_finding(tool, vuln_ids, package, version, severity, title, location) -> Finding:
+    # SCA: CVE・パッケージ・バージョンで指紋化し、pip-audit/Trivy・複数イメージ間の重複を除去
+    vuln_ids = [vuln_id for vuln_id in vuln_ids if vuln_id]
+    cves = sorted(vuln_id for vuln_id in vuln_ids if vuln_id.upper().startswith("CVE-"))
+    canonical_id = cves[0] if cves else (vuln_ids[0] if vuln_ids else "unknown")
+    package = (package or "").lower()
+    return Finding(tool, "sca", canonical_id, severity, location or f"{package}=={version}", None, title,
+                   _fingerprint("sca", canonical_id, package, version))
+
+def iter_bandit(report: dict):
+    for result in report.get("results", []):
+        cwe = (result.get("issue_cwe") or {}).get("id")
+        yield _code_finding("bandit", result.get("test_id", ""), cwe, normalize_severity(result.get("issue_severity")),
+                            result.get("filename", ""), result.get("line_number"), result.get("issue_text", ""))
+
+def iter_semgrep(report: dict):
+    for result in report.get("results", []):
+        extra = result.get("extra", {})
+        cwe_refs = extra.get("metadata", {}).get("cwe") or []
+        if isinstance(cwe_refs, str):
+            cwe_refs = [cwe_refs]
+        match = next((m for m in map(_CWE_PATTERN.search, cwe_refs) if m), None)
+        yield _code_finding("semgrep", result.get("check_id", ""), match.group(1) if match else None,
+                            normalize_severity(extra.get("severity")), result.get("path", ""),
+                            result.get("start", {}).get("line"), extra.get("message", ""))
+
+def iter_pip_audit(report):
+    # pip-audit -f json: {"dependencies": [...]}; older versions emit the list directly
+    dependencies = report.get("dependencies", []) if isinstance(report, dict) else report
+    for dependency in dependencies:
+        for vuln in dependency.get("vulns", []):
+            yield _dependency_finding("pip-audit", [vuln.get("id")] + vuln.get("aliases", []),
+                                      dependency.get("name"), dependency.get("version"), "unknown",
+                                      vuln.get("description", "")[:200], None)
+
+def iter_trivy(report: dict):
+    for result in report.get("Results") or []:
+        target = result.get("Target", "")
+        for vuln in result.get("Vulnerabilities") or []:
+            yield _dependency_finding("trivy", [vuln.get("VulnerabilityID")], vuln.get("PkgName"),
+                                      vuln.get("InstalledVersion"), normalize_severity(vuln.get("Severity")),
+                                      vuln.get("Title", ""), target)
+
+def _zap_finding(rule_id, cwe, severity, url, method, param, title) -> Finding:
+    url = (url or "").split("?", 1)[0]
+    key = f"CWE-{cwe}" if cwe not in (None, "", "-1", -1) else rule_id
+    return Finding("zap", "dast", rule_id, severity, url, None, title,
+                   _fingerprint("dast", key, url, method or "", param or ""))
+
+def iter_zap(report):
+    if isinstance(report, list):
+        # zap.core.alerts() の戻り値（アラートのフラットなリスト）
+        for alert in report:
+            yield _zap_finding(alert.get("pluginId", ""), alert.get("cweid"), normalize_severity(alert.get("risk")),
+                               alert.get("url"), alert.get("method"), alert.get("param"), alert.get("alert", ""))
+        return
+    for site in report.get("site", []):
+        for alert in site.get("alerts", []):
+            severity = _ZAP_RISK_CODES.get(str(alert.get("riskcode")), "unknown")
+            for instance in alert.get("instances") or [{"uri": site.get("@name")}]:
+                yield _zap_finding(alert.get("pluginid", ""), alert.get("cweid"), severity, instance.get("uri"),
+                                   instance.get("method"), instance.get("param"), alert.get("alert", ""))
+
+def iter_detect_secrets(report: dict):
+    for filename, secrets in report.get("results", {}).items():
+        path = _normalize_path(filename)
+        for secret in secrets:
+            # 行番号は指紋に含めない（行の移動だけで新規扱いにしない）
+            yield Finding("detect-secrets", "secrets", secret.get("type", ""), "high", path,
+                          secret.get("line_number"), secret.get("type", ""),
+                          _fingerprint("secrets", path, secret.get("hashed_secret", "")))
+
+NORMALIZERS = {
+    "bandit": iter_bandit,
+    "semgrep": iter_semgrep,
+    "pip-audit": iter_pip_audit,
+    "trivy": iter_trivy,
+    "zap": iter_zap,
+    "detect-secrets": iter_detect_secrets,
+}
+
+class FindingIndex:
+    """Fingerprint -> Finding map with O(1) dedup and incrementally maintained severity counts.
+
+    `known_fingerprints` (e.g. loaded from a previous run) marks which unique
+    findings are new, so the same issue is only reported once across runs.
+    """
+
+    def __init__(self, known_fingerprints=None):
+        self._findings = {}
+        self._known = set(known_fingerprints or ())
+        self._has_baseline = known_fingerprints is not None
+        self.raw_count = 0
+        self.raw_by_tool = Counter()
+        self.by_severity = Counter()
+        self.by_category = {}
+        self.new_count = 0
+
+    def __len__(self) -> int:
+        return len(self._findings)
+
+    def __iter__(self):
+        return iter(self._findings.values())
+
+    def add(self, finding: Finding) -> bool:
+        """Adds a finding; returns False when it duplicates one already in the index."""
+        self.raw_count += 1
+        self.raw_by_tool[finding.tool] += 1
+        existing = self._findings.get(finding.fingerprint)
+        if existing is None:
+            self._findings[finding.fingerprint] = finding
+            self._count(finding, 1)
+            if finding.fingerprint not in self._known:
+                self.new_count += 1
+            return True
+        existing.occurrences += 1
+        if SEVERITY_RANK[finding.severity] > SEVERITY_RANK[existing.severity]:
+            # 同一指摘をより高い深刻度で報告したツールがあれば、そちらを採用
+            self._count(existing, -1)
+            existing.severity = finding.severity
+            self._count(existing, 1)
+        return False
+
+    def _count(self, finding: Finding, delta: int):
+        self.by_severity[finding.severity] += delta
+        category = self.by_category.setdefault(finding.category, Counter())
+        category[finding.severity] += delta
+
+    def fingerprints(self):
+        return self._findings.keys()
+
+    def summary(self) -> dict:
+        """Severity-bucketed counts in the shape stored under dashboard_data['security']."""
+        summary = {
+            "total_unique": len(self._findings),
+            "total_raw": self.raw_count,
+            "duplicates_removed": self.raw_count - len(self._findings),
+            "by_severity": {severity: self.by_severity[severity] for severity in SEVERITIES},
+            "by_category": {
+                category: {severity: counts[severity] for severity in SEVERITIES}
+                for category, counts in sorted(self.by_category.items())
+            },
+            "raw_by_tool": dict(self.raw_by_tool),
+        }
+        if self._has_baseline:
+            summary["new_findings"] = self.new_count
+        return summary
+
+def load_fingerprints(file_path: Path) -> set:
+    """Reads fingerprints saved by save_fingerprints (concatenated 16-byte digests)."""
+    if not file_path.exists():
+        return set()
+    data = file_path.read_bytes()
+    return {data[i:i + 16] for i in range(0, len(data), 16)}
+
+def save_fingerprints(file_path: Path, fingerprints):
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(file_path, "wb") as f:
+        for fingerprint in fingerprints:
+            f.write(fingerprint)
+
+def normalize_reports(report_files: dict, index: FindingIndex = None, strict: bool = False) -> FindingIndex:
+    """Feeds every existing report in {tool name: path} into one FindingIndex.
+
+    A report that cannot be read or normalized is reported and skipped, or
+    with `strict` re-raised so the caller does not publish partial counts.
+    """
+    index = index if index is not None else FindingIndex()
+    for tool, file_path in report_files.items():
+        file_path = Path(file_path)
+        if not file_path.exists():
+            continue
+        try:
+            with open(file_path, "r") as f:
+                report = json.load(f)
+            for finding in NORMALIZERS[tool](report):
+                index.add(finding)
+        except Exception as e:
+            if strict:
+                raise ValueError(f"cannot normalize {tool} report {file_path}: {e}") from e
+            print(f"Error normalizing {tool} report {file_path}: {e}")
+    return index
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Normalize and deduplicate security reports.")
+    for tool in NORMALIZERS:
+        parser.add_argument(f"--{tool}", type=Path, metavar="REPORT", help=f"{tool} JSON report")
+    parser.add_argument("--baseline", type=Path, help="fingerprint file from a previous run (updated in place)")
+    parser.add_argument("--findings-out", type=Path, help="write the deduplicated findings as JSON lines")
+    args = parser.parse_args(argv)
+
+    report_files = {tool: getattr(args, tool.replace("-", "_")) for tool in NORMALIZERS}
+    known = load_fingerprints(args.baseline) if args.baseline else None
+    index = normalize_reports({tool: path for tool, path in report_files.items() if path}, FindingIndex(known))
+    if args.findings_out:
+        with open(args.findings_out, "w") as f:
+            for finding in index:
+                f.write(json.dumps(finding.to_dict()) + "\n")
+    if args.baseline:
+        save_fingerprints(args.baseline, index.fingerprints())
+    print(json.dumps(index.summary(), indent=2))
+
+if __name__ == "__main__":
+    main()